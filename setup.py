@@ -4,6 +4,7 @@ setup(
         name="viz",
         version="0.1",
         packages=find_packages(),
+        package_data={"src.visualise": ["colourmaps.npz"]},
         install_requires=["numpy", "Pillow",  "imagio"],
 
         author="Joseph Dye",
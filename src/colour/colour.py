@@ -2,8 +2,15 @@
 Didn't really have a plan so what was once a large class with lots of functionality
 got rewritten multiple times until it became tiny, containing functions that
 probably shouldn't be inside of it.
+
+ColourArray holds many colours of the same colour space as a single (N, 3)
+array. Gradients can contain thousands of colours so storing them as individual
+Colour objects wastes a lot of memory and time.
 """
 
+import numpy as np
+
+
 class Colour:
     def __init__(self, a, b, c, colour_space="sRGB", scale_rgb=False):
         if (colour_space == "RGB" or colour_space == "sRGB") and scale_rgb:
@@ -34,5 +41,56 @@ class Colour:
         a, b, c = self.channels
         return (round(a, precision), round(b, precision), round(c, precision))
 
+
+class ColourArray:
+    def __init__(self, channels, colour_space="sRGB", scale_rgb=False):
+        channels = np.array(channels, dtype=np.float64).reshape(-1, 3)
+        if (colour_space == "RGB" or colour_space == "sRGB") and scale_rgb:
+            channels /= 255
+        self.colour_space = colour_space
+        self.channels = channels
+
+    @classmethod
+    def from_colours(cls, colours):
+        """Pack a sequence of Colour objects (all in the same colour space) into a ColourArray."""
+        colours = list(colours)
+        if not colours:
+            raise ValueError("can't create a ColourArray from an empty sequence")
+
+        colour_space = colours[0].colour_space
+        if any(colour.colour_space != colour_space for colour in colours):
+            raise ValueError("all colours must share the same colour-space")
+        return cls([colour.channels for colour in colours], colour_space)
+
+    def __str__(self):
+        return str(self.channels)
+
+    def __len__(self):
+        return len(self.channels)
+
+    def __iter__(self):
+        for channels in self.channels:
+            yield Colour(*channels.tolist(), colour_space=self.colour_space)
+
+    def __getitem__(self, key):
+        """Integer keys return a single Colour. Slices and index arrays return a new ColourArray."""
+        if isinstance(key, (int, np.integer)):
+            return Colour(*self.channels[key].tolist(), colour_space=self.colour_space)
+        return ColourArray(self.channels[key], self.colour_space)
+
+    def copy(self):
+        return ColourArray(self.channels.copy(), self.colour_space)
+
+    def scale_rgb(self, up=True):
+        if up:
+            channels = self.channels * 255
+        else:
+            channels = self.channels / 255
+        return ColourArray(channels, self.colour_space)
+
+    def get_round_values(self, precision=0):
+        return np.round(self.channels, precision)
+
+
 if __name__ == "__main__":
     pass
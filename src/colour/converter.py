@@ -21,28 +21,95 @@ and conversion logic. This code initalises and populates the
 conversion graph as well as executing the 'conversion_path' output
 by the graph.
 
-TODO:
-Add more colour spaces. Munsell and CIE CAM02 are particularly
-interesting for their perceptual uniformity. Munsell can't be created
-by transforming a CIE colour space. It has to be read from a lookup table
-which means additional functionality would need to be added to the
-Colour Converter class. CIE CAM02 would be easier. The maths for converting
-from XYZ to CAM02 can be found on wikipedia. Just got to find time.
+OKLab (and its polar form OKLCh) and CAM16-UCS have been added for their
+perceptual uniformity. OKLab is calculated straight from linear RGB which
+makes it a lot cheaper than going through XYZ and LAB. CAM16-UCS is the
+uniform colour space built on CAM16, the successor to CIE CAM02. It uses
+the default viewing conditions of an average surround, an adapting
+luminance of 64 lux and a background luminance factor of 20.
+
+The reference white defaults to D65 but any of the standard illuminants in
+'reference_whites' (or a custom XYZ white) can be chosen. sRGB is defined
+relative to D65, so for any other white the XYZ values are chromatically
+adapted using Bradford, CAT02 or XYZ scaling. The adaptation matrix is fused
+into the RGB <-> XYZ matrices when the converter is created, so picking a
+different white doesn't add any work per colour.
 
-Support changing the Standard Illuminant / Reference White. Default
-for this project is D65 which isn't ideal.
+TODO:
+Add more colour spaces. Munsell is particularly interesting for its
+perceptual uniformity but it can't be created by transforming a CIE colour
+space. It has to be read from a lookup table which means additional
+functionality would need to be added to the Colour Converter class.
 
 Support changing the viewing angle. Default for this project is 2Degrees.
 Not as useful as be able to change the RefWhite but would be nice functionality.
-
-Provide some colour difference functions.
 """
 
-from src.colour.colour import Colour
+from functools import lru_cache
+
+import numpy as np
+
+from src.colour.colour import Colour, ColourArray
 from src.colour.digraph import DiGraph
 
+
+# Every colour space the converter can convert between.
+colour_spaces = ("RGB", "sRGB", "HSV", "XYZ", "LAB", "LCHab", "OKLab", "OKLCh", "CAM16UCS")
+
+# 2 Degree Observer white points, normalised so Y = 1.
+reference_whites = {
+    "A": (1.09850, 1.00000, 0.35585),
+    "C": (0.98074, 1.00000, 1.18232),
+    "D50": (0.96422, 1.00000, 0.82521),
+    "D55": (0.95682, 1.00000, 0.92149),
+    "D65": (0.95047, 1.00000, 1.08883),
+    "E": (1.00000, 1.00000, 1.00000),
+}
+
+# Cone response matrices used for chromatic adaptation.
+adaptation_methods = {
+    "bradford": ((0.8951, 0.2664, -0.1614),
+                 (-0.7502, 1.7135, 0.0367),
+                 (0.0389, -0.0685, 1.0296)),
+    "cat02": ((0.7328, 0.4296, -0.1624),
+              (-0.7036, 1.6975, 0.0061),
+              (0.0030, 0.0136, 0.9834)),
+    "xyz_scaling": ((1.0, 0.0, 0.0),
+                    (0.0, 1.0, 0.0),
+                    (0.0, 0.0, 1.0)),
+}
+
+
+@lru_cache(maxsize=None)
+def adaptation_matrix(source_white, target_white, method="bradford"):
+    """
+    Matrix that adapts XYZ values relative to source_white so they are relative to target_white.
+    Whites are XYZ tuples. Each combination is only ever calculated once.
+    """
+    if method not in adaptation_methods:
+        raise ValueError(f"{method} is not one of {', '.join(adaptation_methods)}")
+
+    cone_matrix = np.array(adaptation_methods[method])
+    source_cone = cone_matrix @ np.array(source_white)
+    target_cone = cone_matrix @ np.array(target_white)
+    matrix = np.linalg.inv(cone_matrix) @ np.diag(target_cone / source_cone) @ cone_matrix
+    matrix.setflags(write=False)
+    return matrix
+
+
 class ColourConverter:
-    def __init__(self):
+    def __init__(self, reference_white="D65", adaptation="bradford"):
+        """
+        reference_white can be the name of a standard illuminant or an (X, Y, Z) tuple.
+        adaptation is the chromatic adaptation method used when the white isn't D65.
+        """
+        if isinstance(reference_white, str):
+            if reference_white not in reference_whites:
+                raise ValueError(f"{reference_white} is not one of {', '.join(reference_whites)}")
+            reference_white = reference_whites[reference_white]
+        self.reference_white = tuple(float(i) for i in reference_white)
+        self.adaptation = adaptation
+
         self._supported_conversions = [
             ("RGB", "sRGB"),
             ("sRGB", "RGB"),
@@ -57,13 +124,38 @@ class ColourConverter:
             ("LAB", "XYZ"),
 
             ("LAB", "LCHab"),
-            ("LCHab", "LAB")]
+            ("LCHab", "LAB"),
+
+            ("RGB", "OKLab"),
+            ("OKLab", "RGB"),
+
+            ("OKLab", "OKLCh"),
+            ("OKLCh", "OKLab"),
+
+            ("XYZ", "CAM16UCS"),
+            ("CAM16UCS", "XYZ")]
+
+        # sRGB primaries are relative to D65. Fuse the adaptation to the reference white into the matrices.
+        to_white = adaptation_matrix(reference_whites["D65"], self.reference_white, adaptation)
+        from_white = adaptation_matrix(self.reference_white, reference_whites["D65"], adaptation)
+        self.rgb_to_xyz_matrix = to_white @ np.array([[ 0.4124564, 0.3575761, 0.1804375],
+                                                      [ 0.2126729, 0.7151522, 0.0721750],
+                                                      [ 0.0193339, 0.1191920, 0.9503041]])
+        self.xyz_to_rgb_matrix = np.array([[ 3.2404542,  -1.5371385,  -0.4985314],
+                                           [-0.9692660,   1.8760108,   0.0415560],
+                                           [ 0.0556434,  -0.2040259,   1.0572252]]) @ from_white
+        self._cam16 = self.__cam16_viewing_conditions(np.array(self.reference_white) * 100)
         self._conversion_graph = self.__create_conversion_graph()
 
     def __create_conversion_graph(self):
+        """
+        Every edge holds a pair of functions. The first converts a single Colour, the
+        second converts an (N, 3) array of channels and is used for ColourArrays.
+        """
         graph = DiGraph()
         for start, end in self._supported_conversions:
-            conversion_function = eval(f"self.convert_{start}_to_{end}")
+            conversion_function = (getattr(self, f"convert_{start}_to_{end}"),
+                                   getattr(self, f"batch_convert_{start}_to_{end}"))
 
             if start not in graph:
                 vert_one = graph.insert_vertex(start)
@@ -77,12 +169,41 @@ class ColourConverter:
             graph.insert_edge(vert_one, vert_two, conversion_function)
         return graph
 
+    def __cam16_viewing_conditions(self, white, adapting_luminance=64 / np.pi * 0.2, background=20):
+        """
+        Precompute everything CAM16 needs that only depends on the viewing conditions so
+        it isn't recalculated for every colour. White is XYZ in the 0-100 range.
+        """
+        f, c, n_c = 1.0, 0.69, 1.0    # Average surround
+
+        rgb_w = _CAM16_MATRIX @ white
+        d = np.clip(f * (1 - (1 / 3.6) * np.exp((-adapting_luminance - 42) / 92)), 0, 1)
+        d_rgb = d * white[1] / rgb_w + 1 - d
+
+        k = 1 / (5 * adapting_luminance + 1)
+        f_l = (0.2 * k ** 4 * (5 * adapting_luminance)
+               + 0.1 * (1 - k ** 4) ** 2 * np.cbrt(5 * adapting_luminance))
+        n = background / white[1]
+        z = 1.48 + np.sqrt(n)
+        n_bb = 0.725 * n ** -0.2
+
+        rgb_aw = _cam16_compress(d_rgb * rgb_w, f_l)
+        a_w = (2 * rgb_aw[0] + rgb_aw[1] + 0.05 * rgb_aw[2] - 0.305) * n_bb
+
+        return {"c": c, "n_c": n_c, "d_rgb": d_rgb, "f_l": f_l, "n": n, "z": z, "n_bb": n_bb, "a_w": a_w}
+
     def __execute_conversion_path(self, colour, path):
-        for edge in path:
-            colour = edge.element()(colour)
+        if isinstance(colour, ColourArray):
+            for edge in path:
+                colour.channels = edge.element()[1](colour.channels)
+                colour.colour_space = edge.endpoints()[1].element()
+        else:
+            for edge in path:
+                colour = edge.element()[0](colour)
         return colour
 
     def convert_colour(self, colour, final_colour_space):
+        """Convert a Colour or a ColourArray (in place) into the final colour space."""
         conversion_path = self._conversion_graph.find_path(colour.colour_space, final_colour_space, "dfs")
         return self.__execute_conversion_path(colour, conversion_path)
 
@@ -217,9 +338,7 @@ class ColourConverter:
         if colour.colour_space == "RGB":
             colour.colour_space = "XYZ"
 
-            matrix = [[ 0.4124564, 0.3575761, 0.1804375],
-                      [ 0.2126729, 0.7151522, 0.0721750],
-                      [ 0.0193339, 0.1191920, 0.9503041]]
+            matrix = self.rgb_to_xyz_matrix
 
             r, g, b = colour.channels
 
@@ -241,9 +360,7 @@ class ColourConverter:
         if colour.colour_space == "XYZ":
             colour.colour_space = "RGB"
 
-            matrix = [[ 3.2404542,  -1.5371385,  -0.4985314],
-                      [-0.9692660,   1.8760108,   0.0415560],
-                      [ 0.0556434,  -0.2040259,   1.0572252]]
+            matrix = self.xyz_to_rgb_matrix
 
             x, y, z = colour.channels
 
@@ -269,10 +386,7 @@ class ColourConverter:
 
             x, y, z = colour.channels
 
-            # D65 and 2 Degree Oberserver
-            white_x = 95.0470 / 100
-            white_y = 100.000 / 100
-            white_z = 108.883 / 100
+            white_x, white_y, white_z = self.reference_white
 
             x_r = x / white_x
             y_r = y / white_y
@@ -320,9 +434,7 @@ class ColourConverter:
             f_z = f_y - (b / 200)
             f_x = (a / 500) + f_y
 
-            white_x = 95.0470 / 100
-            white_y = 100.000 / 100
-            white_z = 108.883 / 100
+            white_x, white_y, white_z = self.reference_white
 
             k = 24389 / 27
             e = 216 / 24389
@@ -400,6 +512,313 @@ class ColourConverter:
         else:
             raise ValueError("colour-space is not LCHab")
 
+    def convert_RGB_to_OKLab(self, colour):
+        """
+        RGB   ---> R: 0-1, G: 0-1, B: 0-1
+        OKLab <--- L: 0-1, A: -0.4-0.4, B: -0.4-0.4
+        """
+        if colour.colour_space == "RGB":
+            colour.colour_space = "OKLab"
+            r, g, b = colour.channels
+
+            l = 0.4122214708 * r + 0.5363325363 * g + 0.0514459929 * b
+            m = 0.2119034982 * r + 0.6806995451 * g + 0.1073969566 * b
+            s = 0.0883024619 * r + 0.2817188376 * g + 0.6299787005 * b
+
+            from math import copysign
+
+            l, m, s = (copysign(abs(i) ** (1 / 3), i) for i in (l, m, s))
+
+            colour.channels = (0.2104542553 * l + 0.7936177850 * m - 0.0040720468 * s,
+                               1.9779984951 * l - 2.4285922050 * m + 0.4505937099 * s,
+                               0.0259040371 * l + 0.7827717662 * m - 0.8086757660 * s)
+            return colour
+        else:
+            raise ValueError("colour-space is not RGB")
+
+    def convert_OKLab_to_RGB(self, colour):
+        """
+        OKLab ---> L: 0-1, A: -0.4-0.4, B: -0.4-0.4
+        RGB   <--- R: 0-1, G: 0-1, B: 0-1
+        """
+        if colour.colour_space == "OKLab":
+            colour.colour_space = "RGB"
+            l, a, b = colour.channels
+
+            l_ = (l + 0.3963377774 * a + 0.2158037573 * b) ** 3
+            m_ = (l - 0.1055613458 * a - 0.0638541728 * b) ** 3
+            s_ = (l - 0.0894841775 * a - 1.2914855480 * b) ** 3
+
+            colour.channels = ( 4.0767416621 * l_ - 3.3077115913 * m_ + 0.2309699292 * s_,
+                               -1.2684380046 * l_ + 2.6097574011 * m_ - 0.3413193965 * s_,
+                               -0.0041960863 * l_ - 0.7034186147 * m_ + 1.7076147010 * s_)
+            return colour
+        else:
+            raise ValueError("colour-space is not OKLab")
+
+    def convert_OKLab_to_OKLCh(self, colour):
+        """
+        OKLab ---> L: 0-1, A: -0.4-0.4, B: -0.4-0.4
+        OKLCh <--- L: 0-1, C: 0-0.4, H: 0-360
+        """
+        if colour.colour_space == "OKLab":
+            colour.colour_space = "OKLCh"
+            l, a, b = colour.channels
+
+            from math import atan2, degrees, hypot
+
+            colour.channels = (l, hypot(a, b), degrees(atan2(b, a)) % 360)
+            return colour
+        else:
+            raise ValueError("colour-space is not OKLab")
+
+    def convert_OKLCh_to_OKLab(self, colour):
+        """
+        OKLCh ---> L: 0-1, C: 0-0.4, H: 0-360
+        OKLab <--- L: 0-1, A: -0.4-0.4, B: -0.4-0.4
+        """
+        if colour.colour_space == "OKLCh":
+            colour.colour_space = "OKLab"
+            l, c, h = colour.channels
+
+            from math import cos, sin, radians
+
+            colour.channels = (l, c * cos(radians(h)), c * sin(radians(h)))
+            return colour
+        else:
+            raise ValueError("colour-space is not OKLCh")
+
+    def convert_XYZ_to_CAM16UCS(self, colour):
+        """
+        XYZ      ---> X: 0-1, Y: 0-1, Z: 0-1
+        CAM16UCS <--- J: 0-100, A: -50-50, B: -50-50
+
+        The maths is long enough that the scalar version reuses the batched one.
+        """
+        if colour.colour_space == "XYZ":
+            colour.colour_space = "CAM16UCS"
+            colour.channels = tuple(self.batch_convert_XYZ_to_CAM16UCS(np.array([colour.channels]))[0].tolist())
+            return colour
+        else:
+            raise ValueError("colour-space is not XYZ")
+
+    def convert_CAM16UCS_to_XYZ(self, colour):
+        """
+        CAM16UCS ---> J: 0-100, A: -50-50, B: -50-50
+        XYZ      <--- X: 0-1, Y: 0-1, Z: 0-1
+        """
+        if colour.colour_space == "CAM16UCS":
+            colour.colour_space = "XYZ"
+            colour.channels = tuple(self.batch_convert_CAM16UCS_to_XYZ(np.array([colour.channels]))[0].tolist())
+            return colour
+        else:
+            raise ValueError("colour-space is not CAM16UCS")
+
+    # ------ Batched conversions. Take and return (N, 3) arrays of channels.
+    def batch_convert_RGB_to_sRGB(self, channels):
+        return np.where(channels < 0.0031308,
+                        channels * 12.92,
+                        1.055 * np.power(np.maximum(channels, 0.0031308), 1 / 2.4) - 0.055)
+
+    def batch_convert_sRGB_to_RGB(self, channels):
+        return np.where(channels <= 0.04045,
+                        channels / 12.92,
+                        ((np.maximum(channels, 0.04045) + 0.055) / 1.055) ** 2.4)
+
+    def batch_convert_RGB_to_HSV(self, channels):
+        r, g, b = channels[:, 0], channels[:, 1], channels[:, 2]
+
+        c_max = channels.max(axis=1)
+        c_min = channels.min(axis=1)
+        delta = c_max - c_min
+        safe_delta = np.where(delta == 0, 1, delta)
+
+        # Hue Calculation. Order of conditions matches the scalar version.
+        h = np.select([delta == 0, c_max == r, c_max == g],
+                      [0, 60 * (((g - b) / safe_delta) % 6), 60 * (((b - r) / safe_delta) + 2)],
+                      60 * (((r - g) / safe_delta) + 4))
+
+        # Saturation Calculation
+        s = np.where(c_max == 0, 0, delta / np.where(c_max == 0, 1, c_max))
+
+        return np.stack((h, s, c_max), axis=1)
+
+    def batch_convert_HSV_to_RGB(self, channels):
+        h, s, v = channels[:, 0] % 360, channels[:, 1], channels[:, 2]
+
+        c = v * s
+        x = c * (1 - np.abs((h / 60) % 2 - 1))
+        m = v - c
+        zero = np.zeros_like(c)
+
+        sector = np.minimum(h // 60, 5).astype(int)
+        r = np.choose(sector, [c, x, zero, zero, x, c])
+        g = np.choose(sector, [x, c, c, x, zero, zero])
+        b = np.choose(sector, [zero, zero, x, c, c, x])
+
+        return np.stack((r + m, g + m, b + m), axis=1)
+
+    def batch_convert_RGB_to_XYZ(self, channels):
+        return channels @ self.rgb_to_xyz_matrix.T
+
+    def batch_convert_XYZ_to_RGB(self, channels):
+        return np.abs(channels @ self.xyz_to_rgb_matrix.T)
+
+    def batch_convert_XYZ_to_LAB(self, channels):
+        white = np.array(self.reference_white)
+
+        k = 24389 / 27
+        e = 216 / 24389
+
+        ratios = channels / white
+        f = np.where(ratios > e, np.cbrt(ratios), (k * ratios + 16) / 116)
+        f_x, f_y, f_z = f[:, 0], f[:, 1], f[:, 2]
+
+        l = 116 * f_y - 16
+        a = 500 * (f_x - f_y)
+        b = 200 * (f_y - f_z)
+        return np.stack((l, a, b), axis=1)
+
+    def batch_convert_LAB_to_XYZ(self, channels):
+        l, a, b = channels[:, 0], channels[:, 1], channels[:, 2]
+
+        f_y = (l + 16) / 116
+        f_z = f_y - (b / 200)
+        f_x = (a / 500) + f_y
+
+        white = np.array(self.reference_white)
+
+        k = 24389 / 27
+        e = 216 / 24389
+
+        x_r = np.where(f_x ** 3 > e, f_x ** 3, (116 * f_x - 16) / k)
+        y_r = np.where(l > (k * e), f_y ** 3, l / k)
+        z_r = np.where(f_z ** 3 > e, f_z ** 3, (116 * f_z - 16) / k)
+
+        return np.stack((x_r, y_r, z_r), axis=1) * white
+
+    def batch_convert_LAB_to_LCHab(self, channels):
+        l, a, b = channels[:, 0], channels[:, 1], channels[:, 2]
+        c = np.hypot(a, b)
+        h = np.degrees(np.arctan2(b, a)) % 360    # If hue is < 0 degrees add 360 degrees
+        return np.stack((l, c, h), axis=1)
+
+    def batch_convert_LCHab_to_LAB(self, channels):
+        l, c, h = channels[:, 0], channels[:, 1], np.radians(channels[:, 2])
+        return np.stack((l, c * np.cos(h), c * np.sin(h)), axis=1)
+
+    def batch_convert_RGB_to_OKLab(self, channels):
+        return np.cbrt(channels @ _OKLAB_LMS_MATRIX.T) @ _OKLAB_MATRIX.T
+
+    def batch_convert_OKLab_to_RGB(self, channels):
+        return (channels @ _OKLAB_INVERSE_MATRIX.T) ** 3 @ _OKLAB_LMS_INVERSE_MATRIX.T
+
+    def batch_convert_OKLab_to_OKLCh(self, channels):
+        l, a, b = channels[:, 0], channels[:, 1], channels[:, 2]
+        return np.stack((l, np.hypot(a, b), np.degrees(np.arctan2(b, a)) % 360), axis=1)
+
+    def batch_convert_OKLCh_to_OKLab(self, channels):
+        l, c, h = channels[:, 0], channels[:, 1], np.radians(channels[:, 2])
+        return np.stack((l, c * np.cos(h), c * np.sin(h)), axis=1)
+
+    def batch_convert_XYZ_to_CAM16UCS(self, channels):
+        vc = self._cam16
+
+        rgb_a = _cam16_compress(vc["d_rgb"] * (channels * 100 @ _CAM16_MATRIX.T), vc["f_l"])
+        r_a, g_a, b_a = rgb_a[:, 0], rgb_a[:, 1], rgb_a[:, 2]
+
+        a = r_a - 12 * g_a / 11 + b_a / 11
+        b = (r_a + g_a - 2 * b_a) / 9
+        h = np.arctan2(b, a)
+
+        e_t = (np.cos(h + 2) + 3.8) / 4
+        achromatic = (2 * r_a + g_a + 0.05 * b_a - 0.305) * vc["n_bb"]
+        j = 100 * np.maximum(achromatic / vc["a_w"], 0) ** (vc["c"] * vc["z"])
+
+        t = (50000 / 13 * vc["n_c"] * vc["n_bb"] * e_t * np.hypot(a, b)) / (r_a + g_a + 21 / 20 * b_a)
+        c = np.abs(t) ** 0.9 * np.sqrt(j / 100) * (1.64 - 0.29 ** vc["n"]) ** 0.73
+        m = c * vc["f_l"] ** 0.25
+
+        # Uniform colour space
+        j_ucs = 1.7 * j / (1 + 0.007 * j)
+        m_ucs = np.log1p(0.0228 * m) / 0.0228
+        return np.stack((j_ucs, m_ucs * np.cos(h), m_ucs * np.sin(h)), axis=1)
+
+    def batch_convert_CAM16UCS_to_XYZ(self, channels):
+        vc = self._cam16
+
+        j_ucs, a_ucs, b_ucs = channels[:, 0], channels[:, 1], channels[:, 2]
+        h = np.arctan2(b_ucs, a_ucs)
+        m = np.expm1(0.0228 * np.hypot(a_ucs, b_ucs)) / 0.0228
+        j = j_ucs / (1.7 - 0.007 * j_ucs)
+
+        c = m / vc["f_l"] ** 0.25
+        sqrt_j = np.sqrt(np.maximum(j, 0) / 100)
+        t = (c / np.where(sqrt_j == 0, 1, sqrt_j * (1.64 - 0.29 ** vc["n"]) ** 0.73)) ** (1 / 0.9)
+
+        e_t = (np.cos(h + 2) + 3.8) / 4
+        achromatic = vc["a_w"] * (np.maximum(j, 0) / 100) ** (1 / (vc["c"] * vc["z"]))
+
+        # Solve for the opponent dimensions a and b (see Li et al. 2017)
+        p_1 = 50000 / 13 * vc["n_c"] * vc["n_bb"] * e_t / np.where(t == 0, 1, t)
+        p_2 = achromatic / vc["n_bb"] + 0.305
+        p_3 = 21 / 20
+        n = p_2 * (2 + p_3) * (460 / 1403)
+
+        sin_h, cos_h = np.sin(h), np.cos(h)
+        use_sin = np.abs(sin_h) >= np.abs(cos_h)
+        safe_sin = np.where(use_sin, sin_h, 1)
+        safe_cos = np.where(use_sin, 1, cos_h)
+
+        b_sin = n / (p_1 / safe_sin + (2 + p_3) * (220 / 1403) * (cos_h / safe_sin) - 27 / 1403 + p_3 * (6300 / 1403))
+        a_cos = n / (p_1 / safe_cos + (2 + p_3) * (220 / 1403) - (27 / 1403 - p_3 * (6300 / 1403)) * (sin_h / safe_cos))
+
+        a = np.where(use_sin, b_sin * cos_h / safe_sin, a_cos)
+        b = np.where(use_sin, b_sin, a_cos * sin_h / safe_cos)
+        a = np.where(t == 0, 0, a)
+        b = np.where(t == 0, 0, b)
+
+        rgb_a = np.stack(((460 * p_2 + 451 * a + 288 * b) / 1403,
+                          (460 * p_2 - 891 * a - 261 * b) / 1403,
+                          (460 * p_2 - 220 * a - 6300 * b) / 1403), axis=1)
+
+        rgb = _cam16_decompress(rgb_a, vc["f_l"]) / vc["d_rgb"]
+        return rgb @ _CAM16_INVERSE_MATRIX.T / 100
+
+
+# ------ Constants and helpers for OKLab and CAM16
+_OKLAB_LMS_MATRIX = np.array([[0.4122214708, 0.5363325363, 0.0514459929],
+                              [0.2119034982, 0.6806995451, 0.1073969566],
+                              [0.0883024619, 0.2817188376, 0.6299787005]])
+_OKLAB_MATRIX = np.array([[0.2104542553,  0.7936177850, -0.0040720468],
+                          [1.9779984951, -2.4285922050,  0.4505937099],
+                          [0.0259040371,  0.7827717662, -0.8086757660]])
+_OKLAB_INVERSE_MATRIX = np.array([[1.0,  0.3963377774,  0.2158037573],
+                                  [1.0, -0.1055613458, -0.0638541728],
+                                  [1.0, -0.0894841775, -1.2914855480]])
+_OKLAB_LMS_INVERSE_MATRIX = np.array([[ 4.0767416621, -3.3077115913,  0.2309699292],
+                                      [-1.2684380046,  2.6097574011, -0.3413193965],
+                                      [-0.0041960863, -0.7034186147,  1.7076147010]])
+
+_CAM16_MATRIX = np.array([[ 0.401288, 0.650173, -0.051461],
+                          [-0.250268, 1.204414,  0.045854],
+                          [-0.002079, 0.048952,  0.953127]])
+_CAM16_INVERSE_MATRIX = np.linalg.inv(_CAM16_MATRIX)
+
+
+def _cam16_compress(rgb, f_l):
+    """Post-adaptation non-linear response compression."""
+    x = (f_l * np.abs(rgb) / 100) ** 0.42
+    return np.sign(rgb) * 400 * x / (x + 27.13) + 0.1
+
+
+def _cam16_decompress(rgb_a, f_l):
+    """Inverse of _cam16_compress."""
+    rgb_a = rgb_a - 0.1
+    x = np.abs(rgb_a)
+    return np.sign(rgb_a) * 100 / f_l * (27.13 * x / (400 - x)) ** (1 / 0.42)
+
+
 if __name__ == "__main__":
     colour = Colour(0, 0, 1, "HSV")
     converter = ColourConverter()
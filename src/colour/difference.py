@@ -0,0 +1,122 @@
+"""
+Colour Difference
+-----------------
+
+Functions for measuring the perceptual difference between LAB colours.
+All of them work on arrays of any shape as long as the last axis holds the
+L, A and B channels, so a whole gradient (N, 3) or a whole image (H, W, 3)
+can be compared in one call. Maths taken from Bruce Lindbloom's website
+and Sharma's CIEDE2000 implementation notes.
+
+Passing a single array to 'delta_e' compares each colour with the one after
+it along the second to last axis. For a gradient from 'Gradient.blend' that
+gives the step size between neighbouring colours, which is a quick way of
+checking how smooth the gradient is.
+"""
+
+import numpy as np
+
+
+def delta_e_76(lab_1, lab_2):
+    """Euclidean distance in LAB."""
+    lab_1, lab_2 = np.asarray(lab_1, dtype=np.float64), np.asarray(lab_2, dtype=np.float64)
+    return np.linalg.norm(lab_1 - lab_2, axis=-1)
+
+
+def delta_e_94(lab_1, lab_2, textiles=False):
+    """CIE94. The graphic arts weightings are used unless textiles is set."""
+    lab_1, lab_2 = np.asarray(lab_1, dtype=np.float64), np.asarray(lab_2, dtype=np.float64)
+    k_l, k_1, k_2 = (2, 0.048, 0.014) if textiles else (1, 0.045, 0.015)
+
+    l_1, a_1, b_1 = lab_1[..., 0], lab_1[..., 1], lab_1[..., 2]
+    l_2, a_2, b_2 = lab_2[..., 0], lab_2[..., 1], lab_2[..., 2]
+
+    c_1 = np.hypot(a_1, b_1)
+    c_2 = np.hypot(a_2, b_2)
+
+    delta_l = l_1 - l_2
+    delta_c = c_1 - c_2
+    delta_h_squared = np.maximum((a_1 - a_2) ** 2 + (b_1 - b_2) ** 2 - delta_c ** 2, 0)
+
+    s_c = 1 + k_1 * c_1
+    s_h = 1 + k_2 * c_1
+
+    return np.sqrt((delta_l / k_l) ** 2 + (delta_c / s_c) ** 2 + delta_h_squared / s_h ** 2)
+
+
+def delta_e_2000(lab_1, lab_2):
+    """CIEDE2000 with all parametric weighting factors set to 1."""
+    lab_1, lab_2 = np.asarray(lab_1, dtype=np.float64), np.asarray(lab_2, dtype=np.float64)
+
+    l_1, a_1, b_1 = lab_1[..., 0], lab_1[..., 1], lab_1[..., 2]
+    l_2, a_2, b_2 = lab_2[..., 0], lab_2[..., 1], lab_2[..., 2]
+
+    c_mean = (np.hypot(a_1, b_1) + np.hypot(a_2, b_2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25 ** 7)))
+
+    a_1 = a_1 * (1 + g)
+    a_2 = a_2 * (1 + g)
+    c_1 = np.hypot(a_1, b_1)
+    c_2 = np.hypot(a_2, b_2)
+    h_1 = np.degrees(np.arctan2(b_1, a_1)) % 360
+    h_2 = np.degrees(np.arctan2(b_2, a_2)) % 360
+
+    # Hue difference. Zero when either colour has no chroma.
+    chromatic = (c_1 * c_2) != 0
+    delta_h = h_2 - h_1
+    delta_h = np.where(delta_h > 180, delta_h - 360, delta_h)
+    delta_h = np.where(delta_h < -180, delta_h + 360, delta_h)
+    delta_h = np.where(chromatic, delta_h, 0)
+
+    delta_l = l_2 - l_1
+    delta_c = c_2 - c_1
+    delta_big_h = 2 * np.sqrt(c_1 * c_2) * np.sin(np.radians(delta_h) / 2)
+
+    # Mean hue. Depends on whether the hues are more than 180 degrees apart.
+    h_sum = h_1 + h_2
+    h_mean = np.where(np.abs(h_1 - h_2) > 180,
+                      np.where(h_sum < 360, h_sum + 360, h_sum - 360) / 2,
+                      h_sum / 2)
+    h_mean = np.where(chromatic, h_mean, h_sum)
+
+    l_mean = (l_1 + l_2) / 2
+    c_mean = (c_1 + c_2) / 2
+
+    t = (1 - 0.17 * np.cos(np.radians(h_mean - 30))
+         + 0.24 * np.cos(np.radians(2 * h_mean))
+         + 0.32 * np.cos(np.radians(3 * h_mean + 6))
+         - 0.20 * np.cos(np.radians(4 * h_mean - 63)))
+
+    delta_theta = 30 * np.exp(-(((h_mean - 275) / 25) ** 2))
+    r_c = 2 * np.sqrt(c_mean ** 7 / (c_mean ** 7 + 25 ** 7))
+    s_l = 1 + (0.015 * (l_mean - 50) ** 2) / np.sqrt(20 + (l_mean - 50) ** 2)
+    s_c = 1 + 0.045 * c_mean
+    s_h = 1 + 0.015 * c_mean * t
+    r_t = -np.sin(np.radians(2 * delta_theta)) * r_c
+
+    return np.sqrt((delta_l / s_l) ** 2
+                   + (delta_c / s_c) ** 2
+                   + (delta_big_h / s_h) ** 2
+                   + r_t * (delta_c / s_c) * (delta_big_h / s_h))
+
+
+_methods = {
+    "76": delta_e_76,
+    "94": delta_e_94,
+    "2000": delta_e_2000,
+}
+
+
+def delta_e(lab_1, lab_2=None, method="2000"):
+    """
+    Difference between two arrays of LAB colours using the '76', '94' or '2000' formula.
+    If lab_2 isn't given each colour in lab_1 is compared with the next one along the
+    second to last axis, giving one less result than there are colours.
+    """
+    if method not in _methods:
+        raise ValueError(f"{method} is not one of {', '.join(_methods)}")
+
+    lab_1 = np.asarray(lab_1, dtype=np.float64)
+    if lab_2 is None:
+        lab_1, lab_2 = lab_1[..., :-1, :], lab_1[..., 1:, :]
+    return _methods[method](lab_1, lab_2)
@@ -0,0 +1,67 @@
+"""
+Gamut Mapping
+-------------
+
+Interpolating in a perceptual colour space such as LCHab or OKLCh is great for
+getting even looking gradients, but the shape of the colour solid means
+plenty of the interpolated colours can't be shown on an sRGB display.
+Converting them anyway produces the ugly streaks that used to show up in
+LCHab gradients.
+
+Colours are brought back into gamut by reducing their chroma while keeping
+lightness and hue fixed. The largest chroma that still fits is found with a
+bisection, but rather than bisecting one colour at a time every out-of-gamut
+colour in the batch is bisected at once.
+"""
+
+import numpy as np
+
+# Polar colour space used for chroma reduction and the index of its chroma channel. Colours in any
+# other space (RGB, HSV, XYZ, CAM16UCS...) go through LCHab.
+_polar_spaces = {
+    "LAB": ("LCHab", 1),
+    "LCHab": ("LCHab", 1),
+    "OKLab": ("OKLCh", 1),
+    "OKLCh": ("OKLCh", 1),
+}
+
+
+def to_linear_rgb(converter, colours):
+    """
+    Convert a ColourArray into linear RGB without clipping or taking the absolute
+    value of negative channels, so out of gamut colours can still be detected.
+    """
+    xyz = converter.convert_colour(colours.copy(), "XYZ")
+    return xyz.channels @ converter.xyz_to_rgb_matrix.T
+
+
+def in_gamut(converter, colours, tolerance=1e-6):
+    """Return a boolean array which is True for each colour that fits inside the RGB cube."""
+    rgb = to_linear_rgb(converter, colours)
+    return np.all((rgb >= -tolerance) & (rgb <= 1 + tolerance), axis=1)
+
+
+def map_to_gamut(converter, colours, iterations=24, tolerance=1e-6):
+    """
+    Reduce the chroma of every out of gamut colour until it fits inside the RGB cube.
+    Returns a new ColourArray in the same colour space as the input.
+    """
+    polar_space, chroma_channel = _polar_spaces.get(colours.colour_space, ("LCHab", 1))
+    polar = converter.convert_colour(colours.copy(), polar_space)
+
+    outside = np.flatnonzero(~in_gamut(converter, polar, tolerance))
+    if len(outside) > 0:
+        candidates = polar[outside]
+        low = np.zeros(len(outside))
+        high = candidates.channels[:, chroma_channel].copy()
+
+        for _ in range(iterations):
+            middle = (low + high) / 2
+            candidates.channels[:, chroma_channel] = middle
+            fits = in_gamut(converter, candidates, tolerance)
+            low = np.where(fits, middle, low)
+            high = np.where(fits, high, middle)
+
+        # Lower bound always fits (or is zero chroma when even a grey won't fit)
+        polar.channels[outside, chroma_channel] = low
+    return converter.convert_colour(polar, colours.colour_space)
@@ -1,122 +1,93 @@
 """
-Given two input colours, create a gradient with the given number of colour
-spaces using the colour space provided.
+Given two or more input colours, create a gradient with the given number of
+colours using the colour space provided.
 
 TODO:
-Reimpliment giving more than two colours as input for a gradient.
-
-Rewrite 'generate_interval_list' function. The idea is awful and I only did it
-this way to see if it would work. Could be done so much cleaner. wtf.
-
 Remove 'reverse_direction' boolean. It's not hard to determine which direction
 the shortest path to the correct colour is. I was just lazy.
 """
 
-from src.colour.colour import Colour
+from src.colour.colour import Colour, ColourArray
 from src.colour.converter import ColourConverter
+from src.colour.difference import delta_e
+from src.colour.gamut import map_to_gamut
 
 from PIL import Image, ImageDraw
 import numpy as np
 
 
 class Gradient:
+    _hue_channels = {"HSV": 0, "LCHab": 2, "OKLCh": 2}    # Index of the hue channel for cylindrical colour spaces
+    perceptual_spaces = ("LAB", "LCHab", "OKLab", "OKLCh")   # Spaces blend(perceptual=True) is meant for
+
     def __init__(self, *colours):
+        """Accepts any number of Colour objects or a single ColourArray."""
         self.converter = ColourConverter()
-        self.colours = [self.converter.convert_colour(colour, "RGB") for colour in colours]
+        if len(colours) == 1 and isinstance(colours[0], ColourArray):
+            self.colours = self.converter.convert_colour(colours[0].copy(), "RGB")
+        else:
+            # Converted as copies, convert_colour works in place and the caller's colours should stay as they were
+            self.colours = ColourArray.from_colours(self.converter.convert_colour(Colour(*colour.channels, colour.colour_space), "RGB")
+                                                    for colour in colours)
 
     def convert_gradient_colour_space(self, colour_space):
         """Convert gradient array into desired colour space."""
-        for colour in self.colours:
-            self.converter.convert_colour(colour, colour_space)
+        self.converter.convert_colour(self.colours, colour_space)
         return self
 
-    def group_colours(self):
-        """Yield two colours from the gradient array at a time."""
-        for i in range(len(self.colours) - 1):
-            yield self.colours[i:i + 2]
-
-    def generate_interval_list(self, final_amount):
-        """Generates the number of interpolations that need to be done per colour grouping
-        to achieve the desired output number of colours. Only necessary for the LCHab which
-        gets interpolated twice, once in LCHab and again in RGB. Saves time as LCHab to RGB
-        is expensive and  errors can occur when interpolating in the LCHab colour space due to
-        the shape of it's colour solid.
+    def interpolate(self, final_amount, hue_channel=None, reverse_direction=False):
+        """Create exactly final_amount colours spread evenly across every pair of neighbouring
+        input colours. All stops are calculated in one go rather than one colour at a time.
+        """
+        channels = self.colours.channels
+        if len(channels) == 1:
+            return ColourArray(np.repeat(channels, final_amount, axis=0), self.colours.colour_space)
+
+        starts = channels[:-1].copy()
+        ends = channels[1:].copy()
+        if hue_channel is not None and reverse_direction:
+            # Traverse the colour space in the opposite direction by lifting the smaller hue of each pair
+            lift_start = starts[:, hue_channel] < ends[:, hue_channel]
+            starts[lift_start, hue_channel] += 360
+            ends[~lift_start, hue_channel] += 360
+
+        # Position of every stop along the gradient. Integer part is the pair, fractional part the blend.
+        positions = np.linspace(0, len(starts), final_amount)
+        pairs = np.minimum(positions.astype(int), len(starts) - 1)
+        fractions = (positions - pairs)[:, np.newaxis]
+
+        new_channels = starts[pairs] + (ends[pairs] - starts[pairs]) * fractions
+        return ColourArray(new_channels, self.colours.colour_space)
+
+    def blend(self, final_amount, colour_space="RGB", reverse_direction=False, perceptual=False):
+        """
+        Setting perceptual interpolates every stop in the given colour space and then reduces the chroma
+        of any colours that fall outside of the RGB gamut. It's meant for LAB, LCHab, OKLab and OKLCh, but
+        works in any space. Chroma is reduced in LCHab for spaces without a polar form of their own.
         """
-        num_of_existing_colours = len(self.colours)
-        num_of_colours_to_create = final_amount - num_of_existing_colours
-
-        loops_per_interpolation = num_of_colours_to_create // (num_of_existing_colours - 1)
-        if loops_per_interpolation > 0:
-            remainder = num_of_colours_to_create // loops_per_interpolation
-            interval_list = []
-            for i in range(len(self.colours) - 1):
-                if remainder > 0:
-                    interval = 1 / (loops_per_interpolation + 2)
-                    remainder -= 1
-                else:
-                    interval = 1 / (loops_per_interpolation + 1)
-                interval_list.append(interval)
-        else:
-            interval_list = [1]
-        return interval_list
-
-    def interpolate_between(self, start, end, interval):
-        """Helper function for the interpolate function. Generates colours between two input colours."""
-        new_colours = [start]
-        step = interval
-        while interval < 1:
-            new_x = start[0] + (end[0] - start[0]) * interval
-            new_y = start[1] + (end[1] - start[1]) * interval
-            new_z = start[2] + (end[2] - start[2]) * interval
-            new_colour = Colour(new_x, new_y, new_z, start.colour_space)
-            new_colours.append(new_colour)
-            interval += step
-        return new_colours
-
-    def interpolate(self, interval_list):
-        """Create gradient from the input colours. Group them into twos and pass to the helper function."""
-        new_colours = []
-        for start, end in self.group_colours():
-            interval = interval_list.pop()
-            temp = self.interpolate_between(start, end, interval)
-            new_colours.extend(temp)
-        new_colours.append(self.colours[-1])
-        return new_colours
-
-    def blend(self, final_amount, colour_space="RGB", reverse_direction=False):
         self.convert_gradient_colour_space(colour_space)
+        hue_channel = self._hue_channels.get(colour_space)
 
-        if colour_space == "RGB" or colour_space == "XYZ" or colour_space == "LAB":
-            interval_list = self.generate_interval_list(final_amount)
-            self.colours = self.interpolate(interval_list)
-
-        elif colour_space == "HSV":
-            if reverse_direction:
-                # Traverse the colour space in the opposite direction
-                if self.colours[0][0] < self.colours[-1][0]:
-                    self.colours[0].channels = (self.colours[0][0] + 360, self.colours[0][1], self.colours[0][2])
-                else:
-                    self.colours[1].channels = (self.colours[1][0] + 360, self.colours[1][1], self.colours[1][2])
-            interval_list = self.generate_interval_list(final_amount)
-            self.colours = self.interpolate(interval_list)
+        if perceptual:
+            self.colours = self.interpolate(final_amount, hue_channel, reverse_direction)
+            self.colours = map_to_gamut(self.converter, self.colours)
 
         elif colour_space == "LCHab":
-            if reverse_direction:
-                # Traverse the colour space in the opposite direction
-                if self.colours[0][2] < self.colours[-1][2]:
-                    self.colours[0].channels = (self.colours[0][0], self.colours[0][1], self.colours[0][2] + 360)
-                else:
-                    self.colours[1].channels = (self.colours[1][0], self.colours[1][1], self.colours[1][2] + 360)
-
-            # Interpolate to generate a few LCHab colours
-            interval_list = self.generate_interval_list(3)
-            self.colours = self.interpolate(interval_list)
+            # Interpolate to generate a few LCHab colours. Two extra between each pair of input colours.
+            self.colours = self.interpolate(3 * len(self.colours) - 2, hue_channel, reverse_direction)
 
             # Interpolate again in RGB colour space to populate to desired amount
             self.blend(final_amount, "RGB")
+        else:
+            self.colours = self.interpolate(final_amount, hue_channel, reverse_direction)
         self.convert_gradient_colour_space("sRGB")
         return self
 
+    def delta_e(self, method="2000"):
+        """Perceptual difference between each pair of neighbouring colours in the gradient."""
+        lab = self.converter.convert_colour(self.colours.copy(), "LAB")
+        return delta_e(lab.channels, method=method)
+
 
 if __name__ == "__main__":
     from src.gradient.utilities import create_multi_gradient_array, create_image
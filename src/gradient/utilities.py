@@ -8,38 +8,46 @@ poorly written.
 from PIL import Image, ImageDraw
 import numpy as np
 
+from src.colour.colour import ColourArray
 
-def create_pixel_gradient(x_res, y_res, colours):
-    pixels = np.zeros((y_res, x_res, 3), dtype="uint8")
-
-    column = 0
-    step = x_res // len(colours)
-    remainder = x_res % len(colours)
-
-    for colour in colours:
-        if remainder > 0:
-            pixels[:, column:column+step+1 , :] = colour.scale_rgb().channels
-            remainder -=1
-            column += step + 1
-        else:
-            pixels[:, column:column+step , :] = colour.scale_rgb().channels
-            column += step
-    return pixels
 
-def create_multi_gradient_array(gradients, x_res, y_res, spacer_thickness):
-    num_of_gradients = len(gradients)
-    final_y_res = (y_res * num_of_gradients) + (spacer_thickness * num_of_gradients)
+def _as_channels(colours):
+    """Accept a ColourArray, an (N, 3) array or a list of Colour objects. Returns an (N, 3) array."""
+    if isinstance(colours, ColourArray):
+        return colours.channels
+    if isinstance(colours, np.ndarray):
+        return colours.reshape(-1, 3)
+    return ColourArray.from_colours(colours).channels
 
-    pixels = np.zeros((final_y_res, x_res, 3), dtype="uint8")
+def column_widths(x_res, num_colours):
+    """Width of each colour's block. Columns left over from the division go to the first colours."""
+    step, remainder = divmod(x_res, num_colours)
+    widths = np.full(num_colours, step)
+    widths[:remainder] += 1
+    return widths
 
-    row = spacer_thickness
-    step = y_res
+def create_pixel_row(x_res, colours):
+    """Turn colours (channels in the 0-1 range) into a single (x_res, 3) row of uint8 pixels."""
+    channels = (_as_channels(colours) * 255).astype("uint8")
+    return np.repeat(channels, column_widths(x_res, len(channels)), axis=0)
 
-    for gradient in gradients:
-        pixels[row+step:row+step+spacer_thickness, :, :] = (32, 33, 33)
-        pixels[row:row+step, :, :] = create_pixel_gradient(x_res, y_res, gradient.colours)
-        row += step + spacer_thickness
-    return pixels
+def create_pixel_gradient(x_res, y_res, colours):
+    """Colours can be a ColourArray, an (N, 3) array or a list of Colour objects. Channels are expected in the 0-1 range."""
+    row = create_pixel_row(x_res, colours)
+    return np.ascontiguousarray(np.broadcast_to(row, (y_res, x_res, 3)))
+
+def create_multi_gradient_array(gradients, x_res, y_res, spacer_thickness):
+    """
+    Stack gradients on top of each other. Each gradient gets a block made up of a spacer
+    (black above the first gradient, grey otherwise) followed by the gradient itself.
+    """
+    rows = np.stack([create_pixel_row(x_res, gradient.colours) for gradient in gradients])
+
+    blocks = np.empty((len(gradients), spacer_thickness + y_res, x_res, 3), dtype="uint8")
+    blocks[:, :spacer_thickness] = (32, 33, 33)
+    blocks[0, :spacer_thickness] = 0
+    blocks[:, spacer_thickness:] = rows[:, np.newaxis]
+    return blocks.reshape(-1, x_res, 3)
 
 def create_image(pixel_array, colour_spaces, start_colour, end_colour, x_res, y_res, header_height):
     image = Image.fromarray(pixel_array)
@@ -1,119 +1,441 @@
 """
 Provides an interface for generating sorting visualisations.
 
-TODO:
-Creating GIFs can be a hassle. Need to have proper argument parsing, or maybe just a full CLI.
+Single render:
+    python -m src.main bubble_sort --colour-map magma --resolution 600x600 --fps 16
 
-Provide support for multi-colour input when creating gradients. Previously supported this but
-removed it due to the code being messy. I'll reimplement it in a cleaner way when I find the time.
+Batch render:
+    python -m src.main --batch jobs.json
 
-Provide error checking when using LCHab colour space. Shape of colour volume results in
-unsupported RGB values when interpolating. As is, you just end up with ugly streaks in the gradient.
+A batch file holds a job matrix. Every key is one of the settings below (with
+underscores) and maps to a value or a list of values. One job is made for every
+combination of the values, e.g.
+
+    {
+        "algorithm": ["bubble_sort", "merge_sort"],
+        "colour_map": ["viridis", "magma", "plasma"],
+        "resolution": ["600x600", "300x300"],
+        "fps": [16, 30],
+        "seed": 0
+    }
+
+The sorting trace only depends on the arrangement of the integers being sorted
+and the algorithm, not on the colours. Jobs that share an algorithm and an input
+arrangement (input size, distribution and seed) are sorted once and then rendered
+once for every colour map, frame rate and so on.
 """
 
-import random
+import argparse
+import hashlib
+import itertools
+import json
 import sys
 from datetime import datetime
 from pathlib import Path
 
-import imageio
 import numpy as np
 from PIL import Image, ImageDraw
 
 from src.colour.colour import Colour
+from src.colour.converter import colour_spaces
 from src.gradient.gradient import Gradient
 from src.gradient.utilities import create_pixel_gradient
 
 from src.visualise.utilities import *
+from src.visualise.profiler import Profiler
+from src.visualise.cache import TraceCache
+from src.visualise.events import Highlighter
+from src.visualise.live import FFplaySink, MJPEGSink
+from src.visualise.writers import open_writer, codecs
+from src.visualise.renderers import renderers
 from src.visualise.visualiser import SortingVisualiser
 from src.visualise.colourmaps import  generate_gradient, colourmaps
+from src.visualise.distributions import distributions, duplicate_keys
 
 
-if __name__ == "__main__":
-    # -- Set USE_IMAGE to True if you want to sort an image. False if you want to use a gradient.
-    USE_IMAGE = False  # Use an image or gradient as input?
-    IMAGE_NAME = "starry_night_mid.jpg"  # Image name. Place image in ../img/input
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULTS = {
+    # -- Set image to the name of an image in ../img/input to sort an image instead of a gradient.
+    "image": None,
 
     # -- If using a gradient, set gradient settings.
-    COLOUR_MAP = "viridis"   # choose from "custom", "viridis", "inferno", "plasma" and "magma"
+    "colour_map": "viridis",    # "custom", "viridis", "inferno", "plasma", "magma" or a registered colour map
+    "colours": ["#270561", "#c78d28"],  # colours for custom gradients. Two or more.
+    "num_colours": 200,  # total colours in gradient
+    "graphic_type": "pixels",  # or "bars", "wheel", "spiral" or "disparity". See src.visualise.renderers
+    "colour_space": "LCHab",  # interpolation colour space for custom gradients
+    "reverse_direction": True,  # Direction of interpolation. True to reverse. Only for custom gradients.
+    "perceptual": True,  # Interpolate every colour in LAB/LCHab/OKLab/OKLCh and map out of gamut colours back into RGB. Ignored for other spaces.
 
-    COLOUR_1 = "#270561"  # starting colour for custom gradients
-    COLOUR_2 = "#c78d28"  # ending colour for custom gradients
+    # -- Visualisation attributes
+    "preview": False,  # Show the gradient and exit
+    "algorithm": None,  # Algorithm to use
+    "randomise": True,  # Randomise the image?
+    "reverse": False,  # Reverse the image?
+    "distribution": None,  # Overrides randomise/reverse. e.g. "nearly_sorted", "few_unique", "organ_pipe", "sawtooth"
+    "seed": None,  # Set to an integer to make the shuffle (and any random pivots) reproducible.
+    "duration": 15,  # Duration of GIF in seconds
+    "scale": True,  # Does image need to be upscaled?
+    "resolution": "600x600",  # Resolution of GIF
+    "fps": 16,  # FPS of GIF
+    "highlight": False,  # Highlight the elements compared (red) and read (white) in each frame. Makes sorting slower.
+    "highlight_recent": None,  # Only highlight this many of the latest compares and reads of each row per frame
+    "live": None,  # Watch the render as it's made. "ffplay" opens a window, "mjpeg" serves it over HTTP
+    "live_port": 8080,  # Port for the "mjpeg" live preview
+    "output": None,  # Output file for a single render, output directory for a batch. Defaults to ../img/<algorithm>
+    "format": "gif",  # File type when output isn't a file name. "gif", "png" (APNG), "webp", or "mp4", "webm", "mkv" to encode video with ffmpeg
+    "codec": None,  # Video codec, "h264", "vp9" or "ffv1" (lossless). Defaults to the usual one for the format
+    "preset": None,  # Encoder preset, e.g. "veryfast" for h264 or "realtime" for vp9
+    "crf": None,  # Video quality, lower is better
+    "threads": None,  # Threads for ffmpeg to encode with
 
-    # COLOUR_1 = "#65c268"
-    # COLOUR_2 = "#8159de"
+    # -- Trace cache
+    "cache": None,  # Directory to cache sorting traces in. Re-rendering the same sort then skips sorting.
+    "cache_size": 1024,  # Maximum size of the cache in MB. Least recently used traces are deleted first.
+    "out_of_core": False,  # Stream the trace to a temporary file instead of holding it in memory. For huge O(n^2) sorts.
 
-    NUM_COLOURS = 200  # total colours in gradient
-    GRAPHIC_TYPE = "pixels"  # alternative is "bars"
-    COLOUR_SPACE = "LCHab"  # interpolation colour space for custom gradients
-    DIRECTION = True  # Direction of interpolation. True to reverse. Only for custom gradients.
+    # -- Profiling
+    "profile": False,  # Print a table of time, CPU time and FPS for each stage
+    "profile_memory": False,  # Also measure memory allocated in each stage. Slows Python code down a lot, so times are marked
+    "profile_functions": False,  # Also time the hot functions (the renderer, _replace_with_pixels, __swap_pixels)
+    "profile_stats": None,  # Path to dump cProfile stats to, readable with pstats. Only used if profile is set.
+}
 
-    # -- Visualisation attributes
 
-    PREVIEW_GRADIENT = False
-    RANDOM = True  # Randomise the image?
-    REVERSE = False  # Reverse the image?
-    ALGORITHM = sys.argv[1]  # Algorithm to use
-    GIF_DURATION = 15  # Duration of GIF
-    SCALE = True  # Does image need to be upscaled?
-    RESCALE_X = 600  # x res of GIF
-    RESCALE_Y = 600  # y res of GIF
-    FPS = 16  # FPS of GIF
-    FRAME_DELAY = 1 / FPS  # Delay between each GIF frame
-    TOTAL_FRAMES = FPS * GIF_DURATION
+def parse_resolution(resolution):
+    """Turn "600x400" into (600, 400)."""
+    x_res, y_res = (int(i) for i in str(resolution).lower().split("x"))
+    return x_res, y_res
+
+
+def gradient_rows(settings):
+    """Number of rows in a gradient input."""
+    if settings["graphic_type"] in ("bars", "disparity"):
+        return 1
+    x_res, y_res = parse_resolution(settings["resolution"])
+    return round(y_res / (x_res / settings["num_colours"]))  # Maintain square pixel dimension during image upscaling.
+
 
+def build_pixels(settings):
+    """Load the input image or generate the input gradient."""
     # -- Load image for use with visualiser
-    if USE_IMAGE:
-        img_path = Path(__file__).resolve().parent.parent / "img" / "input" / IMAGE_NAME
-        img = Image.open(img_path)
-        pixels = np.array(img)
+    if settings["image"]:
+        img = Image.open(ROOT / "img" / "input" / settings["image"])
+        return np.array(img.convert("RGB"))
 
-    # -- Generate gradient for use with visualiser
+    # -- Generate custom colour map using ColCon and GradientCreator
+    rows = gradient_rows(settings)
+    if settings["colour_map"] == "custom":
+        colours = [Colour(*hex_to_rgb(colour), scale_rgb=True) for colour in settings["colours"]]  # Scaled down to 0-1 range
+
+        # Create gradient and turn gradient into a pixel array.
+        gradient = Gradient(*colours)
+        perceptual = settings["perceptual"] and settings["colour_space"] in Gradient.perceptual_spaces
+        gradient.blend(settings["num_colours"], settings["colour_space"],
+                       reverse_direction=settings["reverse_direction"], perceptual=perceptual)
+        return create_pixel_gradient(settings["num_colours"], rows, gradient.colours)
+
+    # -- Use existing matplotlib colour map
+    gradient = generate_gradient(colourmaps[settings["colour_map"]], settings["num_colours"])
+    return create_pixel_gradient(settings["num_colours"], rows, gradient)
+
+
+def create_cache(settings):
+    if settings["cache"] is None:
+        return None
+    return TraceCache(settings["cache"], max_bytes=settings["cache_size"] * 2 ** 20)
+
+
+def create_visualiser(pixels, settings):
+    return SortingVisualiser(pixels, randomise=settings["randomise"], reverse=settings["reverse"],
+                             seed=settings["seed"], distribution=settings["distribution"])
+
+
+def sort_key(settings):
+    """Jobs with the same sort key produce the same trace and only need to be sorted once."""
+    if settings["image"]:
+        size = ("image", settings["image"])
     else:
-        if GRAPHIC_TYPE == "bars":
-            V_COLOURS = 1
-        else:
-            V_COLOURS = round(RESCALE_Y / (RESCALE_X / NUM_COLOURS))  # Maintain square pixel dimension during image upscaling.
-
-        # -- Generate custom colour map using ColCon and GradientCreator
-        if COLOUR_MAP == "custom":
-            start_colour = Colour(*hex_to_rgb(COLOUR_1), scale_rgb=True)    # Create colours and scale_rgb down to 0-1 range
-            end_colour = Colour(*hex_to_rgb(COLOUR_2), scale_rgb=True)
-
-            # Create gradient and turn gradient into a pixel array.
-            gradient = Gradient(start_colour, end_colour)   # Initialise gradient object
-            gradient.blend(NUM_COLOURS, COLOUR_SPACE, reverse_direction=DIRECTION)   # interpolate a gradient with NUM_COLOURS using COLOUR_SPACE
-            pixels = create_pixel_gradient(NUM_COLOURS, V_COLOURS, gradient.colours)    # turn colours of gradient into a pixel array
-
-        # -- Use existing matplotlib colour map
-        else:
-            gradient = generate_gradient(colourmaps[COLOUR_MAP], NUM_COLOURS)    # create gradient of NUM_COLOURS
-            pixels = create_pixel_gradient(NUM_COLOURS, V_COLOURS, gradient)    # turn gradient into a pixel array
-        #  -- Preview gradient and exit program if flag is set
-        if PREVIEW_GRADIENT:
-            img = Image.fromarray(pixels)
-            img.resize((RESCALE_X, RESCALE_Y), Image.NEAREST).show()
-            sys.exit()
+        size = ("gradient", settings["num_colours"], gradient_rows(settings))
+    return (settings["algorithm"], size, settings["randomise"], settings["reverse"],
+            settings["distribution"], settings["seed"], settings["highlight"])
+
+
+# Settings that don't change the rendered file, left out of job hashes used in file names
+_not_rendered = {"output", "preview", "live", "live_port", "threads", "cache", "cache_size", "out_of_core",
+                 "profile", "profile_memory", "profile_functions", "profile_stats"}
+
+
+def job_hash(settings, ignore=()):
+    """Short hash of a job's settings, leaving out the keys in ignore."""
+    settings = {key: value for key, value in settings.items() if key not in ignore}
+    return hashlib.sha256(json.dumps(settings, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def variant_name(settings):
+    """
+    File name for a job in a batch. The main settings are spelled out, and a hash of every setting
+    that changes the render keeps jobs that differ in anything else from overwriting each other.
+    """
+    colours = settings["image"] or settings["colour_map"]
+    if settings["colour_map"] == "custom" and not settings["image"]:
+        colours = "custom_" + settings["colour_space"] + "_" + "-".join(c.lstrip("#") for c in settings["colours"])
+    name = f"{Path(colours).stem}_{settings['graphic_type']}_{settings['resolution']}_{settings['fps']}fps_{settings['duration']}s"
+    if settings["highlight"]:
+        name += "_highlight"
+    return f"{name}_{job_hash(settings, _not_rendered)[:8]}"
+
+
+def render(visualiser, settings, path, profiler):
+    """
+    Visualise a sorted visualiser, scale the frames and save them. Frames are streamed to the writer
+    (and the live preview, if there is one) as they're made rather than collected first.
+    Returns the path saved to, or None if the render was aborted by closing the preview.
+    """
+    x_res, y_res = parse_resolution(settings["resolution"])
+    fps = settings["fps"]
+    total_frames = fps * settings["duration"]
+    frame_delay = 1 / fps  # Delay between each GIF frame
+
+    # -- If there are less swaps than frames in the gif, lower frame rate until 1 swap per frame
+    if visualiser.max_swaps / total_frames < 1:
+        total_frames = visualiser.max_swaps
+        frame_delay = settings["duration"] / total_frames
+
+    # -- Watch the render as it happens
+    sink = None
+    if settings["live"] == "mjpeg":
+        sink = MJPEGSink(1 / frame_delay, port=settings["live_port"])
+        print(f"Watch at {sink.url}")
+    elif settings["live"]:
+        sink = FFplaySink(1 / frame_delay, title=settings["algorithm"])
+
+    # -- Draw frames at the desired resolution. Bars always need drawing, pixels only if they're being scaled
+    renderer = None
+    if settings["scale"] or settings["graphic_type"] != "pixels":
+        renderer = renderers[settings["graphic_type"]](visualiser.palette, x_res, y_res)
+
+    highlight = None
+    if settings["highlight"]:
+        highlight = Highlighter(visualiser.events, visualiser.replaced.shape, recent=settings["highlight_recent"])
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = open_writer(path, 1 / frame_delay, codec=settings["codec"], preset=settings["preset"],
+                         crf=settings["crf"], threads=settings["threads"])
+
+    with writer, profiler.stage("Rendering") as stage:
+        for frame, rect in visualiser.iter_frames(total_frames, settings["algorithm"], dirty_rects=True,
+                                                  renderer=renderer, highlight=highlight):
+            if sink is not None:
+                sink.send(frame)
+                if sink.closed:
+                    break
+            writer.write(frame, rect)
+        stage["frames"] = writer.frames
+
+    if sink is not None:
+        sink.close(wait=not sink.closed)
+        if sink.closed:
+            print("Preview closed, render aborted")
+            path.unlink(missing_ok=True)
+            return None
+    return path
+
+
+def create_profiler(settings):
+    profiler = Profiler(enabled=settings["profile"], track_memory=settings["profile_memory"],
+                        cprofile=settings["profile_stats"] is not None)
+    if settings["profile_functions"]:
+        profiler.instrument_hot_functions()
+    return profiler
+
+
+def report(profiler, settings):
+    if settings["profile"]:
+        profiler.unwrap()
+        print(profiler.summary())
+        if settings["profile_stats"] is not None:
+            profiler.dump_stats(settings["profile_stats"])
+
+
+def run(settings):
+    """Render a single job."""
+    profiler = create_profiler(settings)
+
+    with profiler.stage("Building input"):
+        pixels = build_pixels(settings)
+
+    #  -- Preview gradient and exit program if flag is set
+    if settings["preview"]:
+        x_res, y_res = parse_resolution(settings["resolution"])
+        Image.fromarray(pixels).resize((x_res, y_res), Image.NEAREST).show()
+        return None
 
     # -- Create our file directory (if it doesn't exist) and create file name.
-    path = Path(__file__).resolve().parent.parent / "img" / ALGORITHM
-    path.mkdir(parents=True, exist_ok=True)
-    path /= datetime.now().strftime("%y-%m-%d_%H-%M-%S.gif")
+    path = settings["output"] or ROOT / "img" / settings["algorithm"] / datetime.now().strftime(f"%y-%m-%d_%H-%M-%S.{settings['format']}")
 
     # -- Sort the image and visualise the swaps made.
-    visualiser = SortingVisualiser(pixels, randomise=RANDOM, reverse=REVERSE)
-    visualiser.sort(ALGORITHM)
+    with profiler.stage("Sorting"):
+        visualiser = create_visualiser(pixels, settings)
+        visualiser.sort(settings["algorithm"], cache=create_cache(settings), out_of_core=settings["out_of_core"],
+                        events=settings["highlight"])
 
-    # -- If there are less swaps than frames in the gif, lower frame rate until 1 swap per frame
-    if visualiser.max_swaps / TOTAL_FRAMES < 1:
-        TOTAL_FRAMES = visualiser.max_swaps
-        FRAME_DELAY = GIF_DURATION / TOTAL_FRAMES
-        FPS = TOTAL_FRAMES / GIF_DURATION
-    frames = visualiser.visualise(TOTAL_FRAMES, ALGORITHM)
-
-    # -- Scale to desired resolution
-    if SCALE:
-        frames = scale_frames_nn(frames, RESCALE_X, RESCALE_Y)
-
-    # -- Save
-    imageio.mimsave(path, frames, duration=FRAME_DELAY)
+    path = render(visualiser, settings, path, profiler)
+    report(profiler, settings)
+    return path
+
+
+def check_job(settings):
+    """Raise ValueError for settings that can't be rendered."""
+    if settings["algorithm"] not in SortingVisualiser.sorting_methods:
+        raise ValueError(f"{settings['algorithm']} is not a sorting algorithm")
+    if settings["colour_space"] not in colour_spaces:
+        raise ValueError(f"{settings['colour_space']} is not one of {', '.join(colour_spaces)}")
+    if settings["algorithm"] in SortingVisualiser.unique_keys_only and settings["distribution"] in duplicate_keys:
+        raise ValueError(f"{settings['algorithm']} can't sort the repeated keys of the {settings['distribution']} distribution")
+    if settings["highlight"] and settings["algorithm"] in SortingVisualiser.no_events:
+        raise ValueError(f"{settings['algorithm']} doesn't sort in place, so it can't be highlighted")
+
+
+def expand_jobs(matrix, base=None):
+    """Turn a job matrix into a list of settings, one for every combination of values."""
+    unknown = set(matrix) - set(DEFAULTS)
+    if unknown:
+        raise ValueError(f"unknown settings in job matrix: {', '.join(sorted(unknown))}")
+
+    keys = list(matrix)
+    values = []
+    for key in keys:
+        value = matrix[key]
+        # "colours" is already a list, so it needs a list of lists to vary
+        if not isinstance(value, list) or (key == "colours" and not isinstance(value[0], list)):
+            value = [value]
+        values.append(value)
+
+    jobs = []
+    for combination in itertools.product(*values):
+        settings = dict(base or DEFAULTS)
+        settings.update(zip(keys, combination))
+        check_job(settings)
+        jobs.append(settings)
+    return jobs
+
+
+def run_batch(jobs, settings):
+    """
+    Render every job, sorting each distinct (algorithm, input arrangement) only once.
+    Returns the paths of the files written.
+    """
+    profiler = create_profiler(settings)
+    cache = create_cache(settings)
+    groups = {}
+    for job in jobs:
+        groups.setdefault(sort_key(job), []).append(job)
+
+    paths = []
+    for group in groups.values():
+        first = group[0]
+        with profiler.stage("Building input"):
+            pixels = build_pixels(first)
+        with profiler.stage("Sorting"):
+            sorted_visualiser = create_visualiser(pixels, first)
+            sorted_visualiser.sort(first["algorithm"], cache=cache, out_of_core=first["out_of_core"],
+                                   events=first["highlight"])
+
+        for job in group:
+            with profiler.stage("Building input"):
+                visualiser = sorted_visualiser.recolour(build_pixels(job))
+
+            directory = Path(job["output"]) / job["algorithm"] if job["output"] else ROOT / "img" / job["algorithm"]
+            path = directory / f"{variant_name(job)}.{job['format']}"
+            path = render(visualiser, job, path, profiler)
+            if path is not None:
+                paths.append(path)
+                print(f"Saved {path}")
+
+    report(profiler, settings)
+    return paths
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Create GIFs of sorting algorithms sorting gradients or images.")
+    parser.add_argument("algorithm", nargs="?", choices=list(SortingVisualiser.sorting_methods),
+                        help="sorting algorithm to visualise. Not needed with --batch.")
+    parser.add_argument("--batch", metavar="JOBS", help="JSON file holding a job matrix to render")
+
+    inputs = parser.add_argument_group("input")
+    inputs.add_argument("--image", help="name of an image in img/input to sort instead of a gradient")
+    inputs.add_argument("--colour-map", help="viridis, magma, inferno, plasma, a registered map or custom")
+    inputs.add_argument("--colours", nargs="+", metavar="HEX", help="colours for a custom gradient")
+    inputs.add_argument("--num-colours", type=int)
+    inputs.add_argument("--graphic-type", choices=list(renderers))
+    inputs.add_argument("--colour-space", choices=colour_spaces, help="interpolation colour space for custom gradients")
+    inputs.add_argument("--reverse-direction", action=argparse.BooleanOptionalAction)
+    inputs.add_argument("--perceptual", action=argparse.BooleanOptionalAction)
+    inputs.add_argument("--preview", action="store_true", help="show the gradient and exit")
+
+    arrangement = parser.add_argument_group("input arrangement")
+    arrangement.add_argument("--randomise", action=argparse.BooleanOptionalAction)
+    arrangement.add_argument("--reverse", action=argparse.BooleanOptionalAction)
+    arrangement.add_argument("--distribution", choices=list(distributions))
+    arrangement.add_argument("--seed", type=int)
+
+    caching = parser.add_argument_group("trace cache")
+    caching.add_argument("--cache", metavar="DIR", help="directory to cache sorting traces in")
+    caching.add_argument("--cache-size", type=int, metavar="MB")
+    caching.add_argument("--out-of-core", action="store_true",
+                         help="stream the trace to disk while sorting instead of keeping it in memory")
+
+    output = parser.add_argument_group("output")
+    output.add_argument("--duration", type=int, help="seconds")
+    output.add_argument("--fps", type=int)
+    output.add_argument("--resolution", help="WIDTHxHEIGHT")
+    output.add_argument("--scale", action=argparse.BooleanOptionalAction)
+    output.add_argument("--output", help="output file, or output directory with --batch")
+    output.add_argument("--format", choices=["gif", "png", "webp", "mp4", "webm", "mkv"],
+                        help="file type if --output isn't a file. png is an animated PNG")
+    output.add_argument("--codec", choices=list(codecs))
+    output.add_argument("--preset", help="encoder preset, e.g. veryfast for h264")
+    output.add_argument("--crf", type=int, help="video quality, lower is better")
+    output.add_argument("--threads", type=int, help="threads for ffmpeg to encode with")
+    output.add_argument("--live", choices=["ffplay", "mjpeg"], help="watch the render while it's being made")
+    output.add_argument("--live-port", type=int, help="port for --live mjpeg")
+    output.add_argument("--highlight", action="store_true", help="highlight the elements compared and read in each frame")
+    output.add_argument("--highlight-recent", type=int, metavar="N",
+                        help="only highlight the latest N compares and reads of each row per frame")
+
+    profiling = parser.add_argument_group("profiling")
+    profiling.add_argument("--profile", action="store_true")
+    profiling.add_argument("--profile-memory", action="store_true",
+                           help="also measure memory allocated in each stage, which makes it run slower")
+    profiling.add_argument("--profile-functions", action="store_true")
+    profiling.add_argument("--profile-stats", metavar="PATH")
+
+    args = parser.parse_args(argv)
+    if args.algorithm is None and args.batch is None:
+        parser.error("an algorithm or --batch is required")
+
+    settings = dict(DEFAULTS)
+    settings.update({key: value for key, value in vars(args).items() if key in DEFAULTS and value is not None})
+    if args.batch is None:
+        try:
+            check_job(settings)
+        except ValueError as error:
+            parser.error(str(error))
+    return settings, args.batch
+
+
+def main(argv=None):
+    settings, batch = parse_args(argv)
+    if batch:
+        with open(batch) as file:
+            jobs = expand_jobs(json.load(file), settings)
+        run_batch(jobs, settings)
+    else:
+        run(settings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Render server.
+
+Every `python -m src.main` pays for starting python, importing numpy and PIL
+and building the colour converter graph before it can render anything.
+The server is started once and accepts jobs over a unix socket (or TCP on
+localhost). Sorting and encoding run in a pool of worker processes, so the
+event loop is free to take more jobs and send out progress.
+
+    python -m src.server --socket /tmp/sorting-visualiser.sock --workers 4
+    python -m src.server --port 8765
+
+Both directions are newline separated JSON. A request looks like
+
+    {"id": "anything", "job": {"algorithm": "bubble_sort", "colour_map": "magma", "fps": 30}}
+
+"job" takes the same settings as a --batch job matrix (see src.main), so list
+values render every combination. Each render gets a job hash and a stream of
+events back, tagged with the request's id:
+
+    {"id": ..., "job": "3f0c...", "event": "queued", "duplicate": false}
+    {"id": ..., "job": "3f0c...", "event": "progress", "stage": "Sorting GIF", "fraction": 0.42}
+    {"id": ..., "job": "3f0c...", "event": "done", "path": "/.../img/bubble_sort/3f0c....gif"}
+    {"id": ..., "job": "3f0c...", "event": "error", "error": "..."}
+
+A job identical to one that is still rendering (from any connection) isn't
+rendered again, it's attached to the running one and gets the same events.
+
+Clients can only write inside the server's output directory (--output-dir,
+img by default). Outputs default to <output dir>/<algorithm>/<job hash>.<format>,
+and "output" and "profile_stats" are taken relative to the output directory.
+Paths that end up outside it are refused, as are images from outside
+img/input. Settings that touch the rest of the machine ("cache", "cache_size",
+"out_of_core", "live" and "live_port") belong to the server and can't be set
+by clients.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from src.main import DEFAULTS, ROOT, expand_jobs, job_hash, run
+from src.visualise import progress
+
+# -- Worker process state
+_events = None
+_current_job = None
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+    signal.signal(signal.SIGINT, signal.SIG_IGN)    # Ctrl+C is for the server, it shuts the pool down
+    progress.configure(callback=_report_progress)
+
+
+def _report_progress(event):
+    if _current_job is not None:
+        _events.put((_current_job, event))
+
+
+def _render(job, settings):
+    global _current_job
+    _current_job = job
+    try:
+        return str(run(settings))
+    finally:
+        _current_job = None
+
+
+def _confine(path, directory):
+    """Resolve path relative to directory, refusing anything that ends up outside it."""
+    resolved = (directory / path).resolve()
+    if not resolved.is_relative_to(directory):
+        raise ValueError(f"{path} is outside {directory}")
+    return resolved
+
+
+class RenderServer:
+    server_only = {"cache", "cache_size", "out_of_core", "live", "live_port"}
+
+    def __init__(self, workers=None, defaults=None, output_dir=None):
+        """
+        defaults override src.main.DEFAULTS for every job, e.g. to give every job a trace cache.
+        Jobs can only write inside output_dir, which defaults to img.
+        """
+        self.workers = workers
+        self.defaults = dict(DEFAULTS, **(defaults or {}))
+        self.output_dir = Path(output_dir or ROOT / "img").resolve()
+        self.in_flight = {}     # Job hash -> future for the output path
+        self.subscribers = {}   # Job hash -> functions to send that job's events to
+        self._server = None
+
+    async def start(self, path=None, host="127.0.0.1", port=8765):
+        """Start the worker pool and listen on a unix socket if path is given, otherwise TCP."""
+        self._manager = multiprocessing.Manager()
+        self._events = self._manager.Queue()
+        # Spawned rather than forked, forking once the event loop has started threads can deadlock
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker, initargs=(self._events,))
+        self._forwarder = asyncio.create_task(self._forward_progress())
+
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self._server
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self._events.put(None)
+        await self._forwarder
+        self._pool.shutdown(cancel_futures=True)
+        self._manager.shutdown()
+
+    async def _forward_progress(self):
+        """Pass progress from the workers on to everyone waiting on that job."""
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await loop.run_in_executor(None, self._events.get)
+            if item is None:
+                return
+            job, event = item
+            for send in self.subscribers.get(job, ()):
+                send({"event": "progress", "stage": event["text"], "fraction": round(event["fraction"], 4)})
+
+    def confine(self, settings, job):
+        """Copy of settings with every path a job reads or writes checked and made absolute."""
+        settings = dict(settings, preview=False)
+        output = settings["output"] or Path(settings["algorithm"]) / f"{job}.{settings['format']}"
+        settings["output"] = str(_confine(output, self.output_dir))
+        if settings["profile_stats"] is not None:
+            settings["profile_stats"] = str(_confine(settings["profile_stats"], self.output_dir))
+        if settings["image"]:
+            _confine(settings["image"], (ROOT / "img" / "input").resolve())
+        return settings
+
+    def submit(self, settings, send):
+        """
+        Start rendering settings in the pool, or attach to an identical job that is already rendering.
+        Progress is passed to send. Returns (job hash, future for the output path, duplicate).
+        Raises ValueError if the job would read or write outside the directories it's allowed to.
+        """
+        job = job_hash(settings)
+        settings = self.confine(settings, job)
+        self.subscribers.setdefault(job, []).append(send)
+        if job in self.in_flight:
+            return job, self.in_flight[job], True
+
+        future = asyncio.wrap_future(self._pool.submit(_render, job, settings))
+        self.in_flight[job] = future
+
+        def finished(_):
+            self.in_flight.pop(job, None)
+            self.subscribers.pop(job, None)
+        future.add_done_callback(finished)
+        return job, future, False
+
+    async def _run_job(self, request_id, settings, send):
+        job = None
+
+        def send_job(message):
+            send(dict(message, id=request_id, job=job))
+
+        try:
+            job, future, duplicate = self.submit(settings, send_job)
+        except ValueError as error:
+            send_job({"event": "error", "error": f"bad request: {error}"})
+            return
+        send_job({"event": "queued", "duplicate": duplicate})
+        try:
+            path = await asyncio.shield(future)
+        except Exception as error:
+            send_job({"event": "error", "error": f"{type(error).__name__}: {error}"})
+        else:
+            send_job({"event": "done", "path": path})
+
+    async def _handle(self, reader, writer):
+        def send(message):
+            if not writer.is_closing():
+                writer.write(json.dumps(message).encode() + b"\n")
+
+        tasks = []
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                request_id = None
+                try:
+                    request = json.loads(line)
+                    request_id = request.get("id")
+                    refused = self.server_only.intersection(request["job"])
+                    if refused:
+                        raise ValueError(f"settings can't be set by clients: {', '.join(sorted(refused))}")
+                    jobs = expand_jobs(request["job"], self.defaults)
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    send({"id": request_id, "event": "error", "error": f"bad request: {error}"})
+                    continue
+                for settings in jobs:
+                    tasks.append(asyncio.create_task(self._run_job(request_id, settings, send)))
+
+            # The client closed its side, finish sending the results of everything it asked for
+            await asyncio.gather(*tasks)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def request(job, path=None, host="127.0.0.1", port=8765, request_id=None):
+    """Send a single job to a running server and yield every event sent back."""
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(json.dumps({"id": request_id, "job": job}).encode() + b"\n")
+    await writer.drain()
+    writer.write_eof()
+    async for line in reader:
+        yield json.loads(line)
+    writer.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve sorting visualisation renders over a local socket.")
+    parser.add_argument("--socket", metavar="PATH", help="unix socket to listen on. TCP is used if not given.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, help="number of render processes. Defaults to the number of CPUs.")
+    parser.add_argument("--cache", metavar="DIR", help="trace cache shared by every job")
+    parser.add_argument("--cache-size", type=int, metavar="MB", default=DEFAULTS["cache_size"])
+    parser.add_argument("--output-dir", metavar="DIR", help="directory jobs write to. Defaults to img.")
+    args = parser.parse_args(argv)
+
+    async def serve():
+        server = RenderServer(args.workers, {"cache": args.cache, "cache_size": args.cache_size}, args.output_dir)
+        await server.start(args.socket, args.host, args.port)
+        print(f"Listening on {args.socket or f'{args.host}:{args.port}'}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -78,13 +78,13 @@ def quick_sort(array):
 def _quick_sort(array, start=0, end=None):
     swaps = []
 
-    if not end:
+    if end is None:
         end = len(array) - 1
 
     if start >= end:
         return swaps
 
-    pivot = array[random.randint(0, len(array)-1)]
+    pivot = array[random.randint(start, end)]   # Pivot has to come from the part being sorted
     i, j = start, end
 
     while i <= j:
@@ -199,28 +199,10 @@ def counting_sort(array, max_val=None):
 
 # --- Heap Sorting Algorithm and Heap ADT
 class Heap:
-    # ---------------- Nested Class ---------------- #
-    class _Item:
-        slots = "_key", "_heap_type"
-        def __init__(self, key, heap_type):
-            self._key = key
-            self._heap_type = heap_type
-
-        def __lt__(self, other):
-            if self._heap_type == "min":
-                return self._key < other._key
-            else:
-                return self._key > other._key
-
-        def __str__(self):
-            return str(self._key)
-
-        def __repr__(self):
-            return str(self)
-
     # ---------------- Class Methods ---------------- #
-    def __init__(self, data=(), heap_type="min"):
-        self._data = [self._Item(k, heap_type) for k in data]
+    def __init__(self, data=(), heap_type="min", in_place=False):
+        """With in_place set, data itself is turned into the heap (and sorted) rather than a copy of it."""
+        self._data = data if in_place else list(data)
         self._heap_type = heap_type
         self._size = len(self._data)
         self._swaps = []
@@ -230,6 +212,13 @@ class Heap:
     def __len__(self):
         return self._size
 
+    def _less(self, i, j):
+        """Whether the key at i belongs above the key at j. Smaller keys go first in a min heap."""
+        if self._heap_type == "min":
+            return self._data[i] < self._data[j]
+        else:
+            return self._data[i] > self._data[j]
+
     def _parent(self, i):
         return (i-1) // 2
 
@@ -251,7 +240,7 @@ class Heap:
             small_child = left
             if self._has_right(i):
                 right = self._right(i)
-                if self._data[right] < self._data[left]:
+                if self._less(right, left):
                     small_child = right
             return small_child
 
@@ -260,14 +249,14 @@ class Heap:
         self._data[i], self._data[j] = self._data[j], self._data[i]
 
     def _sift_up(self, i):
-        if i > 0 and self._data[i] < self._data[self._parent(i)]:
+        if i > 0 and self._less(i, self._parent(i)):
             self._swap(i, self._parent(i))
             self._sift_up(self._parent(i))      # recur at position of parent
 
     def _sift_down(self, i):
         if self._has_left(i):
             small_child = self._smallest_child(i)
-            if self._data[small_child] < self._data[i]:
+            if self._less(small_child, i):
                 self._swap(i, small_child)
                 self._sift_down(small_child)        # recur at position of small_child
 
@@ -277,21 +266,20 @@ class Heap:
             self._sift_down(i)
 
     def insert(self, value):
-        item = self._Item(value, self._heap_type)
-        self._data.append(item)
+        self._data.append(value)
         self._size += 1
         self._sift_up(len(self))
 
     def peek(self):
         if len(self) == 0:
             raise IndexError("heap is empty")
-        return self._data[1]._key
+        return self._data[1]
 
     def pop(self):
         if len(self) == 0:
             raise IndexError("heap is empty")
         self._swap(0, len(self)-1)
-        item = self._data.pop()._key
+        item = self._data.pop()
         self._size -= 1
         self._sift_down(0)
         return item
@@ -305,7 +293,7 @@ class Heap:
 
 
 def heap_sort(array):
-    heap = Heap(array.copy(), "max")
+    heap = Heap(array, "max", in_place=True)    # Sorts the array itself, like the other in-place sorts
     return heap.heap_sort()[1]
 
 
@@ -0,0 +1,235 @@
+"""
+Benchmarks for the sorting algorithms.
+
+Runs every algorithm in SortingVisualiser.sorting_methods over a matrix of
+input sizes and input distributions (see src.visualise.distributions) and
+records, for each combination:
+
+    time            best wall time in seconds over the repeats
+    comparisons     number of comparisons between keys
+    operations      length of the trace, i.e. swaps for in-place algorithms
+                    or writes for out-of-place ones
+    trace_bytes     size of the trace stored compactly (int32 pairs for swaps,
+                    int64 values for writes)
+    peak_memory     peak memory allocated while sorting (tracemalloc)
+
+An empirical complexity exponent is fitted for the time and comparisons of
+each algorithm and distribution by a least squares fit on a log-log scale.
+Everything is written out as JSON so results can be compared between runs.
+
+Every run replays the trace on the input and checks the row ends up sorted.
+Runs that don't sort are recorded with an "error" instead of numbers and left
+out of the fits. Combinations the algorithm can't handle at all (my_sort on
+repeated keys) are recorded as "skipped".
+
+Usage:
+    python -m src.visualise.benchmark --sizes 64 128 256 512 --output bench.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from src.visualise.distributions import distributions, duplicate_keys, generate
+from src.visualise.visualiser import SortingVisualiser
+
+
+class _Counted:
+    """Wraps a key and counts every comparison made against it in a shared counter."""
+    __slots__ = "value", "counter"
+
+    def __init__(self, value, counter):
+        self.value = value
+        self.counter = counter
+
+    def _compare(self, other):
+        self.counter[0] += 1
+        return other.value if isinstance(other, _Counted) else other
+
+    def __lt__(self, other):
+        return self.value < self._compare(other)
+
+    def __le__(self, other):
+        return self.value <= self._compare(other)
+
+    def __gt__(self, other):
+        return self.value > self._compare(other)
+
+    def __ge__(self, other):
+        return self.value >= self._compare(other)
+
+    def __eq__(self, other):
+        return self.value == self._compare(other)
+
+    def __ne__(self, other):
+        return self.value != self._compare(other)
+
+    def __hash__(self):
+        return hash(self.value)
+
+    # Arithmetic used by the counting and radix sorts.
+    def __int__(self):
+        return int(self.value)
+
+    __index__ = __int__
+
+    def __float__(self):
+        return float(self.value)
+
+    def __add__(self, other):
+        return self.value + other
+
+    def __floordiv__(self, other):
+        return self.value // other
+
+    def __mod__(self, other):
+        return self.value % other
+
+
+def _trace_bytes(trace):
+    if trace and type(trace[0]) is tuple:
+        return len(trace) * 2 * np.dtype(np.int32).itemsize
+    return len(trace) * np.dtype(np.int64).itemsize
+
+
+def replay(keys, trace):
+    """
+    Row the visualiser ends up with after playing trace over keys. Swaps are applied in order,
+    writes fill the row over and over, so the last len(keys) of them are the final row.
+    """
+    row = list(keys)
+    if trace and type(trace[0]) is tuple:
+        for i, j in trace:
+            row[i], row[j] = row[j], row[i]
+    elif len(trace) >= len(row):
+        row = list(trace[len(trace) - len(row):])
+    return row
+
+
+class NotSorted(ValueError):
+    pass
+
+
+def measure(sorting_method, keys, repeats=3, seed=0):
+    """Measure a single algorithm on a single row of keys. Raises NotSorted if it doesn't sort them."""
+    times = []
+    for _ in range(repeats):
+        row = keys.copy()
+        random.seed(seed)
+        start = time.perf_counter()
+        trace = sorting_method(row)
+        times.append(time.perf_counter() - start)
+
+    if replay(keys.tolist(), trace) != sorted(keys.tolist()):
+        raise NotSorted("replaying the trace doesn't give a sorted row")
+
+    counter = [0]
+    random.seed(seed)
+    sorting_method([_Counted(key, counter) for key in keys.tolist()])
+
+    tracemalloc.start()
+    random.seed(seed)
+    sorting_method(keys.copy())
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time": min(times),
+        "comparisons": counter[0],
+        "operations": len(trace),
+        "trace_type": "swaps" if trace and type(trace[0]) is tuple else "writes",
+        "trace_bytes": _trace_bytes(trace),
+        "peak_memory": peak_memory,
+    }
+
+
+def fit_exponent(sizes, values):
+    """Slope of log(values) against log(sizes). None if there isn't enough usable data."""
+    sizes, values = np.asarray(sizes, dtype=np.float64), np.asarray(values, dtype=np.float64)
+    usable = values > 0
+    if usable.sum() < 2:
+        return None
+    return float(np.polyfit(np.log(sizes[usable]), np.log(values[usable]), 1)[0])
+
+
+def run(algorithms=None, sizes=(64, 128, 256, 512), distribution_names=None, repeats=3, seed=0, verbose=True):
+    algorithms = algorithms or list(SortingVisualiser.sorting_methods)
+    distribution_names = distribution_names or list(distributions)
+    rng = np.random.default_rng(seed)
+
+    results = []
+    fits = []
+    for name in distribution_names:
+        inputs = {size: generate(name, np.arange(size)[np.newaxis, :], rng)[0] for size in sizes}
+
+        for algorithm in algorithms:
+            sorting_method = SortingVisualiser.sorting_methods[algorithm]
+            if algorithm in SortingVisualiser.unique_keys_only and name in duplicate_keys:
+                results.append({"algorithm": algorithm, "distribution": name, "skipped": "needs every key to be different"})
+                if verbose:
+                    print(f"{algorithm:<16}{name:<20}{'skipped':>8}", file=sys.stderr)
+                continue
+
+            rows = []
+            for size in sizes:
+                result = {"algorithm": algorithm, "distribution": name, "size": size}
+                try:
+                    result.update(measure(sorting_method, inputs[size], repeats, seed))
+                except Exception as error:      # A broken algorithm shouldn't stop the rest of the benchmark
+                    result["error"] = f"{type(error).__name__}: {error}"
+                    results.append(result)
+                    if verbose:
+                        print(f"{algorithm:<16}{name:<20}{size:>8}  failed, {result['error']}", file=sys.stderr)
+                    continue
+                rows.append(result)
+                if verbose:
+                    print(f"{algorithm:<16}{name:<20}{size:>8}{result['time']:>12.5f}s"
+                          f"{result['comparisons']:>12}{result['operations']:>12}", file=sys.stderr)
+            results.extend(rows)
+
+            sizes_measured = [row["size"] for row in rows]
+            fits.append({
+                "algorithm": algorithm,
+                "distribution": name,
+                "time_exponent": fit_exponent(sizes_measured, [row["time"] for row in rows]),
+                "comparison_exponent": fit_exponent(sizes_measured, [row["comparisons"] for row in rows]),
+            })
+
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "seed": seed,
+        "repeats": repeats,
+        "results": results,
+        "fits": fits,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the sorting algorithms used by the visualiser.")
+    parser.add_argument("--algorithms", nargs="+", choices=list(SortingVisualiser.sorting_methods))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[64, 128, 256, 512])
+    parser.add_argument("--distributions", nargs="+", choices=list(distributions))
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="file to write the JSON report to. Printed to stdout if not given.")
+    parser.add_argument("--quiet", action="store_true", help="don't print progress to stderr")
+    args = parser.parse_args(argv)
+
+    report = run(args.algorithms, args.sizes, args.distributions, args.repeats, args.seed, not args.quiet)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+On-disk cache of sorting traces.
+
+Sorting the same arrangement of integers with the same algorithm always gives
+the same trace, whatever colours, frame rate or resolution it ends up being
+rendered with. The cache stores traces by a hash of
+
+    algorithm name, algorithms.py source, seed, rows, columns, starting arrangement
+
+(plus whether compare/access events were recorded, see src.visualise.events)
+
+so changing anything that could change the trace (including editing an
+algorithm) just misses the cache instead of returning a stale trace.
+
+Each entry is a directory in the layout written by src.visualise.trace
+(data.npy and offsets.npy) and is loaded with mmap_mode="r", so only the parts
+of the trace being visualised are read into memory. When the cache grows past
+max_bytes the least recently used entries (by modification time, which is
+touched on every load) are deleted. Traces are written to a .tmp- directory
+first and only moved into place once they're complete. Failed sorts delete
+theirs straight away, and eviction deletes any left behind by a process that
+was killed.
+
+    cache = TraceCache("~/.cache/sorting-visualiser", max_bytes=2 ** 30)
+    visualiser.sort("bubble_sort", cache=cache)
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+import src.visualise.algorithms as algos
+from src.visualise import trace
+
+_algorithm_version = hashlib.sha256(Path(algos.__file__).read_bytes()).hexdigest()
+
+
+class TraceCache:
+    stale_after = 24 * 60 * 60      # Seconds before an unfinished .tmp- directory counts as abandoned
+
+    def __init__(self, directory, max_bytes=2 ** 30):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+    @staticmethod
+    def key(algorithm, initial, seed, events=False):
+        """Hash identifying the trace of sorting the integer array 'initial' with 'algorithm'."""
+        initial = np.ascontiguousarray(initial, dtype=np.int64)
+        digest = hashlib.sha256()
+        digest.update(f"{algorithm}\0{_algorithm_version}\0{seed}\0{initial.shape}\0".encode())
+        if events:
+            digest.update(b"events\0")
+        digest.update(initial.tobytes())
+        return digest.hexdigest()
+
+    def load(self, key):
+        """Return (swaps, in_place) for a cached trace, or None if it isn't cached."""
+        path = self.directory / key
+        try:
+            cached = trace.load(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)      # Mark as recently used
+        return cached
+
+    def writer(self):
+        """TraceWriter for streaming a new trace into the cache. Pass it to commit() once closed."""
+        return trace.TraceWriter(tempfile.mkdtemp(dir=self.directory, prefix=".tmp-"))
+
+    def commit(self, key, writer):
+        """Move a trace written with writer() into the cache, evicting old entries to make room for it."""
+        temp = writer.close()
+        self.evict(self.max_bytes - sum(file.stat().st_size for file in temp.iterdir()))
+        try:
+            os.replace(temp, self.directory / key)
+        except OSError:
+            shutil.rmtree(temp, ignore_errors=True)     # Someone else cached the same trace first
+            if not (self.directory / key).exists():
+                raise
+
+    def discard(self, writer):
+        """Throw away a trace from writer() that won't be committed."""
+        writer.abort()
+        shutil.rmtree(writer.directory, ignore_errors=True)
+
+    def store(self, key, swaps, events=None):
+        """Save an in-memory trace, and the events of every row if they were recorded."""
+        writer = self.writer()
+        for row, row_events in zip(swaps, events or [None] * len(swaps)):
+            writer.append(row, row_events)
+        self.commit(key, writer)
+
+    def entries(self):
+        """(path, size in bytes, last used) for every entry, least recently used first."""
+        entries = []
+        for path in self.directory.iterdir():
+            if path.name.startswith(".") or not path.is_dir():
+                continue
+            size = sum(file.stat().st_size for file in path.iterdir())
+            entries.append((path, size, path.stat().st_mtime))
+        return sorted(entries, key=lambda entry: entry[2])
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits in max_bytes, and abandoned temporary directories."""
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        stale = time.time() - self.stale_after
+        for path in self.directory.glob(".tmp-*"):
+            try:
+                if path.stat().st_mtime < stale:
+                    shutil.rmtree(path, ignore_errors=True)
+            except FileNotFoundError:
+                pass
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        self.evict(0)
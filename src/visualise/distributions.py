@@ -0,0 +1,90 @@
+"""
+Input distributions for the sorting visualiser.
+
+Sorting algorithms behave very differently depending on how the input is
+arranged, so for comparing them a randomly shuffled image isn't enough. Each
+function here takes a (rows, columns) array of sorted keys and a
+numpy.random.Generator and returns a new array where every row has been
+rearranged the same way. All rows are handled at once, there are no loops
+over rows.
+"""
+
+import numpy as np
+
+
+def random(keys, rng):
+    """Every row shuffled independently."""
+    return rng.permuted(keys, axis=1)
+
+
+def reversed_order(keys, rng):
+    """Every row in descending order."""
+    return keys[:, ::-1].copy()
+
+
+def nearly_sorted(keys, rng, swaps=None):
+    """Sorted rows with a few random pairs swapped. Defaults to one swap per 20 columns."""
+    rows, columns = keys.shape
+    if swaps is None:
+        swaps = max(1, columns // 20)
+
+    keys = keys.copy()
+    row_index = np.arange(rows)
+    for i, j in zip(rng.integers(0, columns, (swaps, rows)), rng.integers(0, columns, (swaps, rows))):
+        keys[row_index, i], keys[row_index, j] = keys[row_index, j], keys[row_index, i]
+    return keys
+
+
+def few_unique(keys, rng, unique=8):
+    """Shuffled rows that only contain a handful of distinct keys."""
+    columns = keys.shape[1]
+    group_size = -(-columns // min(unique, columns))     # Ceiling division
+    return rng.permuted(keys // group_size * group_size, axis=1)
+
+
+def organ_pipe(keys, rng):
+    """Rows that rise to a peak in the middle and then fall again."""
+    columns = keys.shape[1]
+    order = np.concatenate((np.arange(0, columns, 2), np.arange(columns - 1 - columns % 2, 0, -2)))
+    return keys[:, order]
+
+
+def sawtooth(keys, rng, teeth=4):
+    """Rows made up of several ascending runs, each covering the whole range of keys."""
+    columns = keys.shape[1]
+    order = np.argsort(np.arange(columns) % teeth, kind="stable")
+    return keys[:, order]
+
+
+def partially_shuffled(keys, rng, fraction=0.25):
+    """Sorted rows with a random fraction of the positions shuffled amongst themselves."""
+    rows, columns = keys.shape
+    amount = int(round(fraction * columns))
+
+    positions = np.argsort(rng.random((rows, columns)), axis=1)[:, :amount]
+    values = rng.permuted(np.take_along_axis(keys, positions, axis=1), axis=1)
+
+    keys = keys.copy()
+    np.put_along_axis(keys, positions, values, axis=1)
+    return keys
+
+
+# Distributions that repeat keys. Algorithms that need every key exactly once can't sort them.
+duplicate_keys = {"few_unique"}
+
+distributions = {
+    "random": random,
+    "reversed": reversed_order,
+    "nearly_sorted": nearly_sorted,
+    "few_unique": few_unique,
+    "organ_pipe": organ_pipe,
+    "sawtooth": sawtooth,
+    "partially_shuffled": partially_shuffled,
+}
+
+
+def generate(name, keys, rng, **options):
+    """Rearrange keys using the named distribution. Options are passed on to the distribution function."""
+    if name not in distributions:
+        raise ValueError(f"{name} is not one of {', '.join(distributions)}")
+    return distributions[name](keys, rng, **options)
@@ -0,0 +1,163 @@
+"""
+Compare and access events recorded while sorting, for highlighting the
+positions an algorithm is looking at.
+
+The algorithms in src.visualise.algorithms only return their trace, so events
+are recorded from the outside: sort(events=True) hands each algorithm a
+TrackedArray instead of the plain row. Reading an element (array[i]) logs a
+read, and comparing an element that was read logs a compare for it. Nothing
+changes in the algorithms themselves, so with events off they run exactly as
+before.
+
+Every event is stamped with how far through the trace the algorithm was when
+it happened, so it can be drawn in the frame that shows that part of the sort.
+Each row's events are stored next to its trace (see src.visualise.trace) as
+an (N, 3) int32 array of
+
+    trace position, index, kind (READ or COMPARE)
+
+Every in-place algorithm is tracked. Out-of-place algorithms (merge sort,
+radix sort, counting sort and my_sort, SortingVisualiser.no_events) never
+write to the row, so there's nothing to place their events against in the
+trace, and sort(events=True) refuses them.
+
+    visualiser.sort("quick_sort", events=True)
+    for frame in visualiser.iter_frames(240, highlight=True):
+        ...
+"""
+
+import numpy as np
+
+READ = 0
+COMPARE = 1
+
+# Default highlight colour for each kind of event. Compares are drawn over reads.
+highlight_colours = {
+    READ: (255, 255, 255),
+    COMPARE: (255, 40, 40),
+}
+
+
+class _Value(int):
+    """Element read from a TrackedArray. Remembers where it was read from to log compares."""
+    def __new__(cls, value, index, array):
+        self = super().__new__(cls, value)
+        self.index = index
+        self.array = array
+        return self
+
+    def _compare(self, other):
+        """Log the compare and return other as a plain value, so comparing with it doesn't log again."""
+        self.array.log(self.index, COMPARE)
+        if isinstance(other, _Value):
+            other.array.log(other.index, COMPARE)
+            return int(other)
+        return other
+
+    def __lt__(self, other):
+        return int(self) < self._compare(other)
+
+    def __le__(self, other):
+        return int(self) <= self._compare(other)
+
+    def __gt__(self, other):
+        return int(self) > self._compare(other)
+
+    def __ge__(self, other):
+        return int(self) >= self._compare(other)
+
+    __hash__ = int.__hash__
+
+
+class TrackedArray(np.ndarray):
+    """
+    Integer row that logs reads and compares of its elements. In-place algorithms write two
+    elements for every swap, so the position in the trace is the number of writes halved.
+    Copies and slices don't log anything, as their indices aren't positions in the row.
+    """
+    def __array_finalize__(self, obj):
+        self.events = None
+        self.writes = 0
+
+    def log(self, index, kind):
+        self.events.append((self.writes // 2, index, kind))
+
+    def __getitem__(self, index):
+        value = super().__getitem__(index)
+        if self.events is not None and isinstance(index, (int, np.integer)):
+            index = int(index) % len(self)
+            self.log(index, READ)
+            return _Value(value, index, self)
+        return value
+
+    def __setitem__(self, index, value):
+        if isinstance(index, (int, np.integer)):
+            self.writes += 1
+        super().__setitem__(index, value)
+
+
+def track(row):
+    """View of row that records events. Get them from recorded() once it's sorted."""
+    tracked = np.asarray(row).view(TrackedArray)
+    tracked.events = []
+    return tracked
+
+
+def recorded(tracked):
+    """Events logged by a TrackedArray as an (N, 3) int32 array."""
+    return np.array(tracked.events, dtype=np.int32).reshape(-1, 3)
+
+
+def _search(positions, first, value):
+    """
+    Index of the first position from first on that is at least value. Gallops out from first rather
+    than searching the whole row, as positions is a strided column (often memory mapped) and
+    np.searchsorted would copy all of it.
+    """
+    step = 64
+    while first + step < len(positions) and positions[first + step] < value:
+        first += step
+        step *= 2
+    return first + int(np.searchsorted(positions[first:first + step + 1], value))
+
+
+class Highlighter:
+    """
+    Works out which elements to highlight in each frame. Frames move through the trace in order,
+    so every row keeps a cursor into its events and each frame only searches from there.
+
+    recent limits the highlight to the last few events of each row in the frame, as with large
+    steps nearly every position gets touched in a single frame.
+    """
+    def __init__(self, events, shape, colours=None, recent=None):
+        self.events = events
+        self.rows, self.columns = shape
+        self.colours = highlight_colours if colours is None else colours
+        self.recent = recent
+        self.cursors = [0] * len(events)
+
+    def masks(self, start, end):
+        """(mask, colour) pairs for the events between trace positions start and end, drawn in order."""
+        rows, indices, kinds = [], [], []
+        for row, events in enumerate(self.events):
+            first = _search(events[:, 0], self.cursors[row], start)
+            last = _search(events[:, 0], first, end)
+            self.cursors[row] = last
+            if self.recent is not None:
+                first = max(first, last - self.recent)
+            if last > first:
+                rows.append(np.full(last - first, row))
+                indices.append(events[first:last, 1])
+                kinds.append(events[first:last, 2])
+        if not rows:
+            return []
+
+        rows, indices, kinds = np.concatenate(rows), np.concatenate(indices), np.concatenate(kinds)
+        masks = []
+        for kind, colour in self.colours.items():
+            chosen = kinds == kind
+            if chosen.any():
+                mask = np.zeros((self.rows, self.columns), dtype=bool)
+                mask[rows[chosen], indices[chosen]] = True
+                masks.append((mask, colour))
+        return masks
@@ -0,0 +1,238 @@
+"""
+Live previews of a render.
+
+A sink takes frames as they come out of SortingVisualiser.iter_frames() and
+shows them at the target frame rate while the render carries on:
+
+    FFplaySink      pipes raw RGB frames into an ffplay window
+    MJPEGSink       serves the frames as an MJPEG stream over HTTP, viewable
+                    in a browser at http://127.0.0.1:8080/
+
+    with MJPEGSink(fps=16) as sink:
+        for frame in visualiser.iter_frames(240):
+            sink.send(frame)
+            if sink.closed:
+                break       # Viewer went away
+
+send() paces the render to fps, so frames are shown at the speed they'll
+play back at. It never waits on the viewer though: frames are handed to a
+background thread through a FrameBuffer holding only the newest couple of
+frames, so when the viewer can't keep up the oldest waiting frames are dropped
+instead of piling up in memory or holding the render up. With pace=False the
+render runs flat out and the viewer sees whatever frames it has time for.
+"""
+
+import abc
+import io
+import shutil
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+
+class FrameBuffer:
+    """Bounded, thread safe frame queue that drops the oldest frame when a new one doesn't fit."""
+    def __init__(self, size=2):
+        self.size = size
+        self.frames = []
+        self.dropped = 0
+        self.closed = False
+        self._condition = threading.Condition()
+
+    def put(self, frame):
+        with self._condition:
+            if len(self.frames) >= self.size:
+                self.frames.pop(0)
+                self.dropped += 1
+            self.frames.append(frame)
+            self._condition.notify()
+
+    def get(self):
+        """Wait for the next frame. Returns None once closed and empty."""
+        with self._condition:
+            while not self.frames and not self.closed:
+                self._condition.wait()
+            return self.frames.pop(0) if self.frames else None
+
+    def close(self):
+        with self._condition:
+            self.closed = True
+            self._condition.notify_all()
+
+
+class LiveSink(abc.ABC):
+    """Base class. Subclasses implement show(frame), which is called from a background thread."""
+    def __init__(self, fps, buffer_size=2, pace=True):
+        self.fps = fps
+        self.pace = pace
+        self.buffer = FrameBuffer(buffer_size)
+        self.closed = False         # Set when the viewer goes away
+        self.sent = 0
+        self.shown = 0
+        self._start = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def dropped(self):
+        return self.buffer.dropped
+
+    def send(self, frame):
+        if self.closed:
+            return
+        if self.pace:
+            if self._start is None:
+                self._start = time.monotonic()
+            delay = self._start + self.sent / self.fps - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        self.sent += 1
+        self.buffer.put(frame)
+
+    def _run(self):
+        while True:
+            frame = self.buffer.get()
+            if frame is None:
+                break
+            try:
+                self.show(frame)
+            except OSError:         # Includes BrokenPipeError when ffplay is closed
+                self.closed = True
+                break
+            self.shown += 1
+        self.finish()
+
+    @abc.abstractmethod
+    def show(self, frame):
+        ...
+
+    def finish(self):
+        pass
+
+    def close(self, wait=True):
+        """Stop taking frames. With wait set, block until the frames already sent have been shown."""
+        self.buffer.close()
+        if wait:
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close(wait=exc_info[0] is None)
+
+
+class FFplaySink(LiveSink):
+    """Shows frames in an ffplay window. Closing the window sets closed."""
+    def __init__(self, fps, title="Sorting Visualiser", buffer_size=2, pace=True, executable="ffplay"):
+        if shutil.which(executable) is None:
+            raise FileNotFoundError(f"{executable} not found. Install ffmpeg or use MJPEGSink instead")
+        self.title = title
+        self.executable = executable
+        self.process = None
+        super().__init__(fps, buffer_size, pace)
+
+    def show(self, frame):
+        if self.process is None:        # Frame size isn't known until the first frame arrives
+            height, width, _ = frame.shape
+            self.process = subprocess.Popen(
+                [self.executable, "-loglevel", "error", "-window_title", self.title, "-fflags", "nobuffer",
+                 "-f", "rawvideo", "-pixel_format", "rgb24", "-video_size", f"{width}x{height}",
+                 "-framerate", str(self.fps), "-i", "-"],
+                stdin=subprocess.PIPE)
+        self.process.stdin.write(frame.tobytes())
+
+    def finish(self):
+        if self.process is not None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            self.process.wait()
+
+
+class MJPEGSink(LiveSink):
+    """
+    Serves frames as multipart/x-mixed-replace JPEGs. Any number of viewers can connect, each one
+    gets the newest frame whenever it's ready for one, so a slow viewer skips frames rather than
+    holding anyone else up.
+    """
+    def __init__(self, fps, host="127.0.0.1", port=8080, quality=85, buffer_size=2, pace=True):
+        self.quality = quality
+        self.jpeg = None
+        self.sequence = 0
+        self._new_frame = threading.Condition()
+        self._finished = False
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        super().__init__(fps, buffer_size, pace)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def show(self, frame):
+        output = io.BytesIO()
+        Image.fromarray(frame).save(output, "JPEG", quality=self.quality)
+        with self._new_frame:
+            self.jpeg = output.getvalue()
+            self.sequence += 1
+            self._new_frame.notify_all()
+
+    def finish(self):
+        with self._new_frame:
+            self._finished = True
+            self._new_frame.notify_all()
+
+    def close(self, wait=True):
+        super().close(wait)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def next_jpeg(self, last_sequence):
+        """Wait for a frame newer than last_sequence. Returns (sequence, jpeg) or None when finished."""
+        with self._new_frame:
+            while self.sequence == last_sequence and not self._finished:
+                self._new_frame.wait()
+            if self.sequence == last_sequence:
+                return None
+            return self.sequence, self.jpeg
+
+    def _handler(self):
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+
+                sequence = 0
+                while True:
+                    latest = sink.next_jpeg(sequence)
+                    if latest is None:
+                        return
+                    sequence, jpeg = latest
+                    try:
+                        self.wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                        self.wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                        self.wfile.write(jpeg + b"\r\n")
+                    except (BrokenPipeError, ConnectionResetError):
+                        return
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+sinks = {
+    "ffplay": FFplaySink,
+    "mjpeg": MJPEGSink,
+}
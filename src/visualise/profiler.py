@@ -0,0 +1,151 @@
+"""
+Instrumentation for the rendering pipeline.
+
+A Profiler times named stages of the pipeline (building the input, sorting and
+rendering) with wall time, CPU time and, for stages that produce frames,
+frames per second. With track_memory set it also records the memory allocated
+in each stage via tracemalloc. Tracing every allocation makes Python code
+several times slower (sorting 8x in one measurement), so it's off by default
+and times measured under it (or under cProfile) are marked in the summary.
+Individual hot functions can also be wrapped to count calls and total time
+spent in them. Optionally a cProfile profile is collected across all stages
+and dumped as a pstats file.
+
+    profiler = Profiler(cprofile=True)
+    profiler.instrument_hot_functions()
+    with profiler.stage("Sorting") as stage:
+        visualiser.sort("bubble_sort")
+    with profiler.stage("Rendering") as stage:
+        frames = visualiser.visualise(240)
+        stage["frames"] = len(frames)
+    print(profiler.summary())
+    profiler.dump_stats("render.pstats")
+
+A disabled profiler still works as a context manager but records nothing.
+"""
+
+import cProfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+
+class Profiler:
+    def __init__(self, enabled=True, track_memory=False, cprofile=False):
+        self.enabled = enabled
+        self.track_memory = track_memory and enabled
+        self.stages = []
+        self.functions = {}
+        self._wrapped = []
+        self._profile = cProfile.Profile() if cprofile and enabled else None
+
+    @contextmanager
+    def stage(self, name):
+        """Time everything inside the with block. Set record["frames"] to get frames per second."""
+        record = {"name": name, "frames": None, "traced": self.track_memory or self._profile is not None}
+        if not self.enabled:
+            yield record
+            return
+
+        started_tracing = False
+        if self.track_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracing = True
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+
+        if self._profile is not None:
+            self._profile.enable()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield record
+        finally:
+            record["wall"] = time.perf_counter() - wall_start
+            record["cpu"] = time.process_time() - cpu_start
+            if self._profile is not None:
+                self._profile.disable()
+
+            if self.track_memory:
+                memory_end, memory_peak = tracemalloc.get_traced_memory()
+                record["allocated"] = memory_end - memory_start
+                record["peak_memory"] = memory_peak - memory_start
+                if started_tracing:
+                    tracemalloc.stop()
+
+            if record["frames"] and record["wall"] > 0:
+                record["fps"] = record["frames"] / record["wall"]
+            self.stages.append(record)
+
+    def wrap(self, owner, attribute, name=None):
+        """Replace owner.attribute with a wrapper that counts calls and time spent. Undone by unwrap()."""
+        if not self.enabled:
+            return
+
+        name = name or attribute.lstrip("_").replace("SortingVisualiser__", "")
+        original = getattr(owner, attribute)
+        stats = self.functions.setdefault(name, {"calls": 0, "wall": 0.0})
+
+        @wraps(original)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                stats["calls"] += 1
+                stats["wall"] += time.perf_counter() - start
+
+        setattr(owner, attribute, wrapper)
+        self._wrapped.append((owner, attribute, original))
+
+    def instrument_hot_functions(self):
+        """
+        Wrap the functions that do the per-frame and per-swap work of the pipeline. Every renderer is
+        wrapped, as which one gets used isn't known yet. summary() leaves out the ones never called.
+        """
+        from src.visualise.renderers import renderers
+        from src.visualise.visualiser import SortingVisualiser
+
+        self.wrap(SortingVisualiser, "_replace_with_pixels")
+        self.wrap(SortingVisualiser, "_SortingVisualiser__swap_pixels")
+        for renderer in renderers.values():
+            self.wrap(renderer, "render", f"{renderer.__name__}.render")
+
+    def unwrap(self):
+        while self._wrapped:
+            owner, attribute, original = self._wrapped.pop()
+            setattr(owner, attribute, original)
+
+    def summary(self):
+        """Table of every stage followed by every wrapped function."""
+        if not self.enabled:
+            return ""
+
+        lines = [f"{'Stage':<20}{'Wall (s)':>10}{'CPU (s)':>10}{'Alloc (MB)':>12}{'Peak (MB)':>11}{'FPS':>9}"]
+        for record in self.stages:
+            name = record["name"] + (" *" if record["traced"] else "")
+            allocated = f"{record['allocated'] / 2 ** 20:.1f}" if "allocated" in record else "-"
+            peak = f"{record['peak_memory'] / 2 ** 20:.1f}" if "peak_memory" in record else "-"
+            fps = f"{record['fps']:.1f}" if "fps" in record else "-"
+            lines.append(f"{name:<20}{record['wall']:>10.3f}{record['cpu']:>10.3f}{allocated:>12}{peak:>11}{fps:>9}")
+        lines.append(f"{'Total':<20}{sum(record['wall'] for record in self.stages):>10.3f}"
+                     f"{sum(record['cpu'] for record in self.stages):>10.3f}")
+        if any(record["traced"] for record in self.stages):
+            lines.append("* timed with tracemalloc or cProfile running, which slows it down. Profile without them for real times")
+
+        called = {name: stats for name, stats in self.functions.items() if stats["calls"]}
+        if called:
+            lines.append("")
+            lines.append(f"{'Function':<30}{'Calls':>10}{'Total (s)':>11}{'Per call (ms)':>15}")
+            for name, stats in called.items():
+                per_call = stats["wall"] / stats["calls"] * 1000
+                lines.append(f"{name:<30}{stats['calls']:>10}{stats['wall']:>11.3f}{per_call:>15.3f}")
+        return "\n".join(lines)
+
+    def dump_stats(self, path):
+        """Write the collected cProfile data to a file that can be read with pstats."""
+        if self._profile is None:
+            raise ValueError("profiler was created without cprofile=True")
+        self._profile.dump_stats(path)
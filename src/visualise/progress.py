@@ -0,0 +1,92 @@
+"""
+Progress reporting.
+
+Sorting and rendering call progress_bar once per row or frame, which on large
+images means thousands of updates a second. Formatting and printing a bar for
+every one of them is wasted time, so updates are rate limited: a bar is only
+redrawn when 'interval' seconds have passed since it was last drawn (the first
+and final update are always shown).
+
+Output can be turned off completely or handed to a callback instead of being
+printed, e.g. to write structured logs from batch jobs:
+
+    configure(enabled=False)
+    configure(callback=logging_callback(logging.getLogger("render")))
+"""
+
+import sys
+import time
+
+_settings = {
+    "enabled": True,
+    "interval": 0.1,
+    "stream": None,     # None means sys.stdout at the time of printing
+    "callback": None,
+}
+_last_update = {}
+
+
+def configure(enabled=None, interval=None, stream=None, callback=None):
+    """Change how progress is reported. Arguments left as None keep their current value."""
+    if enabled is not None:
+        _settings["enabled"] = enabled
+    if interval is not None:
+        _settings["interval"] = interval
+    if stream is not None:
+        _settings["stream"] = stream
+    if callback is not None:
+        _settings["callback"] = callback
+
+
+def reset():
+    """Go back to the default of printing bars to stdout at most ten times a second."""
+    configure(enabled=True, interval=0.1)
+    _settings["stream"] = None
+    _settings["callback"] = None
+    _last_update.clear()
+
+
+def _report(text, iteration, max_iteration, length, done):
+    callback = _settings["callback"]
+    if callback is not None:
+        fraction = 1.0 if done else min(max(iteration / max_iteration, 0), 1) if max_iteration else 0.0
+        callback({"text": text.strip(" \t:"), "iteration": iteration, "total": max_iteration,
+                  "fraction": fraction, "done": done})
+        return
+
+    stream = _settings["stream"] or sys.stdout
+    completed = length if done else int(length * iteration / max_iteration) if max_iteration else 0
+    bar = '█' * completed + "-" * (length - completed)
+    if done:
+        stream.write("\r{}|{}|\n".format(text, bar))
+    else:
+        stream.write("\r{}|{}|\r".format(text, bar))
+    stream.flush()
+
+
+def progress_bar(text, iteration, max_iteration, length=40):
+    """Report progress, skipping the update if the bar was redrawn less than 'interval' seconds ago."""
+    if not _settings["enabled"]:
+        return
+
+    now = time.monotonic()
+    last = _last_update.get(text)
+    if last is not None and now - last < _settings["interval"]:
+        return
+    _last_update[text] = now
+    _report(text, iteration, max_iteration, length, False)
+
+
+def progress_complete(text, length=40):
+    _last_update.pop(text, None)
+    if _settings["enabled"]:
+        _report(text, 1, 1, length, True)
+
+
+def logging_callback(logger, level=20):
+    """Callback for configure() that writes each update to a logger as key=value pairs."""
+    def callback(event):
+        logger.log(level, "progress stage=%r iteration=%s total=%s fraction=%.3f done=%s",
+                   event["text"], event["iteration"], event["total"], event["fraction"], event["done"])
+    return callback
+
@@ -0,0 +1,272 @@
+"""
+Renderers turn the visualiser's state (the integer array being sorted) into
+frames at the output resolution.
+
+Everything that only depends on the output resolution (which element each
+output pixel shows) is worked out once when the renderer is made, so drawing
+a frame is a gather from the state and the palette plus, for bars, a single
+broadcast comparison (value > height of each output row). Both cost about the
+same as the _replace_with_pixels and nearest_neighbour path they replace.
+
+    renderer = BarRenderer(visualiser.palette, 600, 600)
+    for frame in visualiser.iter_frames(240, renderer=renderer):
+        ...
+
+    PixelRenderer       the image itself, scaled with nearest neighbour. Gives
+                        exactly the same frames as nearest_neighbour(_replace_with_pixels())
+    BarRenderer         a bar chart of every row, bar height showing the value
+    WheelRenderer       a colour wheel, each row a ring and each column a wedge
+    SpiralRenderer      the rows laid out along a spiral, each row a strand
+    DisparityRenderer   a ring of dots, one per element, drawn closer to the
+                        centre the further the element is from where it belongs
+
+The wheel and spiral have a map from every output pixel to the element it
+shows (or the background), so like PixelRenderer each frame is one gather.
+The disparity dots move as the values change, so their map goes the other
+way: for every position and value, the output pixels of the dot. Each frame
+is a gather from that map and a scatter of the dot colours.
+
+highlight() paints over the pixels drawn for some of the elements, such as
+the ones an algorithm compared during the frame (see src.visualise.events).
+It's done with the same maps: the (rows, columns) mask is gathered through
+the map of which element each pixel shows, and the frame is set where that's
+true.
+"""
+
+import abc
+
+import numpy as np
+
+from src.visualise.utilities import scale_rect
+
+
+class Renderer(abc.ABC):
+    """Base class. Subclasses implement render(state), where state is the (rows, columns) integer array."""
+    def __init__(self, palette, x_res, y_res):
+        self.palette = np.asarray(palette, dtype=np.uint8)
+        self.rows, self.columns = self.palette.shape[:2]
+        self.x_res, self.y_res = x_res, y_res
+
+        # Element shown by every output row and column, worked out the same way as nearest_neighbour
+        self.source_y = (np.arange(y_res) / y_res * self.rows).astype(int)
+        self.source_x = (np.arange(x_res) / x_res * self.columns).astype(int)
+
+    @abc.abstractmethod
+    def render(self, state):
+        ...
+
+    def element_map(self, state):
+        """
+        (y_res, x_res) index (row * columns + column) of the element each pixel shows, with
+        rows * columns where it shows none. By default every pixel shows the nearest element.
+        """
+        if not hasattr(self, "_element_map"):
+            self._element_map = self.source_y[:, np.newaxis] * self.columns + self.source_x
+        return self._element_map
+
+    def highlight(self, frame, state, mask, colour):
+        """Paint the pixels of every element where the (rows, columns) mask is set."""
+        shown = np.append(mask.ravel(), False)[self.element_map(state)]
+        frame[shown] = colour
+
+    def rect(self, rect):
+        """Output rectangle covering everything drawn for the elements inside rect."""
+        return scale_rect(rect, (self.rows, self.columns), self.x_res, self.y_res)
+
+
+class PixelRenderer(Renderer):
+    def render(self, state):
+        rows = self.source_y[:, np.newaxis]
+        return self.palette[rows, state[rows, self.source_x[np.newaxis, :]]]
+
+
+class BarRenderer(Renderer):
+    """
+    The height of each bar is proportional to its value and it's coloured from the palette, so the
+    bars of a sorted row rise in a smooth gradient. With more than one row each row is drawn in its
+    own horizontal band.
+    """
+    def __init__(self, palette, x_res, y_res, background=(0, 0, 0)):
+        super().__init__(palette, x_res, y_res)
+        self.background = np.asarray(background, dtype=np.uint8)
+
+        # Distance of each output row from the bottom of its band, in pixels
+        band_height = np.bincount(self.source_y, minlength=self.rows)
+        band_bottom = np.cumsum(band_height) - 1
+        from_bottom = band_bottom[self.source_y] - np.arange(y_res)
+
+        # A bar of value v covers (v + 1) / columns of its band, so a pixel is inside the bar when v is over this
+        self.thresholds = (from_bottom * self.columns / band_height[self.source_y] - 1)[:, np.newaxis]
+
+        # Every pixel inside a bar takes the colour of its (row, output column), the rest the background
+        self.colour_index = self.source_y[:, np.newaxis] * x_res + np.arange(x_res)
+        self.background_index = self.rows * x_res
+
+    def render(self, state):
+        values = state[:, self.source_x]        # Value of the bar in every output column, (rows, x_res)
+        colours = np.concatenate((self.palette[np.arange(self.rows)[:, np.newaxis], values].reshape(-1, 3),
+                                  self.background[np.newaxis]))
+        inside = values[self.source_y] > self.thresholds
+        return colours[np.where(inside, self.colour_index, self.background_index)]
+
+    def element_map(self, state):
+        inside = state[:, self.source_x][self.source_y] > self.thresholds     # Only the bars are highlighted
+        return np.where(inside, super().element_map(state), self.rows * self.columns)
+
+
+class MappedRenderer(Renderer):
+    """
+    Base class for renderers where every output pixel always shows the same element. Subclasses
+    set self.pixel_map, the (y_res, x_res) index of the element (row * columns + column) shown by
+    each pixel, with self.background_index for pixels showing the background.
+    """
+    def __init__(self, palette, x_res, y_res, background=(0, 0, 0)):
+        super().__init__(palette, x_res, y_res)
+        self.background = np.asarray(background, dtype=np.uint8)
+        self.background_index = self.rows * self.columns
+        self.row_index = np.arange(self.rows)[:, np.newaxis]
+
+        # Polar coordinates of every pixel around the centre, angle clockwise from the top in [0, 1)
+        y, x = np.mgrid[:y_res, :x_res] + 0.5
+        y -= y_res / 2
+        x -= x_res / 2
+        self.radius = np.hypot(x, y)
+        self.angle = (np.arctan2(x, -y) / (2 * np.pi)) % 1
+        self.max_radius = min(x_res, y_res) / 2
+
+    def _column_bounds(self):
+        """Bounding box of the pixels of every column, for working out dirty rectangles."""
+        shown = self.pixel_map != self.background_index
+        columns = self.pixel_map[shown] % self.columns
+        y, x = np.nonzero(shown)
+
+        self.column_top = np.full(self.columns, self.y_res)
+        self.column_left = np.full(self.columns, self.x_res)
+        self.column_bottom = np.zeros(self.columns, dtype=int)
+        self.column_right = np.zeros(self.columns, dtype=int)
+        np.minimum.at(self.column_top, columns, y)
+        np.minimum.at(self.column_left, columns, x)
+        np.maximum.at(self.column_bottom, columns, y + 1)
+        np.maximum.at(self.column_right, columns, x + 1)
+
+    def render(self, state):
+        colours = np.concatenate((self.palette[self.row_index, state].reshape(-1, 3), self.background[np.newaxis]))
+        return colours[self.pixel_map]
+
+    def element_map(self, state):
+        return self.pixel_map
+
+    def rect(self, rect):
+        # Every row of a column is treated as changed, which is a bit bigger than needed but cheap
+        top, left, bottom, right = rect
+        if bottom <= top or right <= left:
+            return 0, 0, 0, 0
+        if not hasattr(self, "column_top"):
+            self._column_bounds()
+        rect = (self.column_top[left:right].min(), self.column_left[left:right].min(),
+                self.column_bottom[left:right].max(), self.column_right[left:right].max())
+        if rect[2] <= rect[0]:      # None of these columns are drawn at this resolution
+            return 0, 0, 0, 0
+        return tuple(int(i) for i in rect)
+
+
+class WheelRenderer(MappedRenderer):
+    """
+    Columns go clockwise round the wheel from the top and rows go outwards in rings, so a sorted
+    gradient becomes a colour wheel. inner is the radius of the hole in the middle, as a fraction
+    of the wheel's radius.
+    """
+    def __init__(self, palette, x_res, y_res, background=(0, 0, 0), inner=0.25):
+        super().__init__(palette, x_res, y_res, background)
+        inner_radius = inner * self.max_radius
+        ring = ((self.radius - inner_radius) / (self.max_radius - inner_radius) * self.rows).astype(int)
+        column = (self.angle * self.columns).astype(int)
+
+        self.pixel_map = np.where((ring >= 0) & (ring < self.rows), ring * self.columns + column, self.background_index)
+
+
+class SpiralRenderer(MappedRenderer):
+    """
+    Columns follow an Archimedean spiral out from the centre, with each element taking the same
+    length of the spiral. Rows are strands side by side across the width of the spiral's arm.
+    fill is how much of the gap between turns the arm covers.
+    """
+    def __init__(self, palette, x_res, y_res, background=(0, 0, 0), turns=3, fill=0.8):
+        super().__init__(palette, x_res, y_res, background)
+        spacing = self.max_radius / (turns + 1)     # Distance between turns, leaving room for the arm on the last one
+
+        # Turns the spiral has made at each pixel, and how far across the arm the pixel is
+        turn = np.floor(self.radius / spacing - self.angle)
+        position = (turn + self.angle) / turns      # How far along the spiral, 0 to 1
+        across = (self.radius / spacing - turn - self.angle) / fill
+
+        on_arm = (turn >= 0) & (position < 1) & (across < 1)
+        column = (np.clip(position, 0, 1) ** 2 * self.columns).astype(int)    # Length of an Archimedean spiral grows with its angle squared
+        strand = (np.clip(across, 0, 1) * self.rows).astype(int)
+        self.pixel_map = np.where(on_arm, np.minimum(strand, self.rows - 1) * self.columns + np.minimum(column, self.columns - 1),
+                                  self.background_index)
+
+
+class DisparityRenderer(Renderer):
+    """
+    Each position gets a dot at a fixed angle round a circle. The dot sits on the circle when the
+    value there belongs there and moves towards the centre the further it is from its sorted
+    position, so the dots spiral out to the rim as the row is sorted. Dots are coloured by value.
+    With more than one row, the rows are drawn over each other.
+    """
+    def __init__(self, palette, x_res, y_res, background=(0, 0, 0), dot_radius=None):
+        super().__init__(palette, x_res, y_res)
+        self.background = np.asarray(background, dtype=np.uint8)
+        self.row_index = np.arange(self.rows)[:, np.newaxis]
+
+        n = self.columns
+        max_radius = min(x_res, y_res) / 2
+        if dot_radius is None:
+            dot_radius = int(np.clip(np.pi * max_radius / n, 1, 6))       # About half the gap between dots on the rim
+        max_radius -= dot_radius + 1
+
+        # Centre of the dot for every (position, value)
+        position, value = np.mgrid[:n, :n]
+        angle = 2 * np.pi * position / n
+        radius = max_radius * (1 - np.abs(position - value) / n)
+        centre_y = np.round(y_res / 2 - radius * np.cos(angle)).astype(np.int32)
+        centre_x = np.round(x_res / 2 + radius * np.sin(angle)).astype(np.int32)
+
+        # Offsets of the pixels of a dot
+        offset_y, offset_x = np.mgrid[-dot_radius:dot_radius + 1, -dot_radius:dot_radius + 1]
+        inside = offset_y ** 2 + offset_x ** 2 <= dot_radius ** 2
+        offset_y, offset_x = offset_y[inside], offset_x[inside]
+        self.dot_size = len(offset_y)
+
+        dot_y = np.clip(centre_y[..., np.newaxis] + offset_y, 0, y_res - 1)
+        dot_x = np.clip(centre_x[..., np.newaxis] + offset_x, 0, x_res - 1)
+        self.dots = (dot_y * x_res + dot_x).astype(np.int32)      # (position, value, pixel) -> flat output pixel
+        self.positions = np.arange(n)
+
+    def render(self, state):
+        frame = np.empty((self.y_res * self.x_res, 3), dtype=np.uint8)
+        frame[:] = self.background
+        pixels = self.dots[self.positions, state]                  # (rows, columns, dot pixels)
+        colours = self.palette[self.row_index, state]               # (rows, columns, 3)
+        frame[pixels.reshape(-1)] = np.repeat(colours.reshape(-1, 3), self.dot_size, axis=0)
+        return frame.reshape(self.y_res, self.x_res, 3)
+
+    def highlight(self, frame, state, mask, colour):
+        rows, positions = np.nonzero(mask)
+        frame.reshape(-1, 3)[self.dots[positions, state[rows, positions]].reshape(-1)] = colour
+
+    def rect(self, rect):
+        # Dots move around the whole frame as values change, so anything changing redraws everything
+        top, left, bottom, right = rect
+        if bottom <= top or right <= left:
+            return 0, 0, 0, 0
+        return 0, 0, self.y_res, self.x_res
+
+
+renderers = {
+    "pixels": PixelRenderer,
+    "bars": BarRenderer,
+    "wheel": WheelRenderer,
+    "spiral": SpiralRenderer,
+    "disparity": DisparityRenderer,
+}
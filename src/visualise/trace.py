@@ -0,0 +1,158 @@
+"""
+Sorting traces stored on disk.
+
+A trace is one list per row of the swaps (in-place algorithms) or writes
+(out-of-place algorithms) made while sorting it. On tall images sorted with
+O(n^2) algorithms it can be far larger than the image: bubble sorting a
+1000x1000 image makes about 250 million swaps, which as Python tuples would
+need tens of GB. Packed as int32 pairs the same trace is 2 GB and it doesn't
+need to be in memory at all.
+
+TraceWriter streams a trace to a directory one row at a time, so only the row
+being sorted is ever held as Python objects:
+
+    data.npy        every row's trace concatenated. (N, 2) int32 swap pairs
+                    for in-place algorithms, (N,) int64 written values for
+                    out-of-place ones
+    offsets.npy     (rows + 1,) int64. Row r is data[offsets[r]:offsets[r+1]]
+
+Traces sorted with events (see src.visualise.events) also have
+
+    events.npy          (M, 3) int32 events of every row concatenated
+    event_offsets.npy   (rows + 1,) int64, the same as offsets.npy
+
+load() memory maps data.npy and returns a view for every row, which the
+visualiser reads through sequentially while rendering. The same layout is
+used by the trace cache.
+"""
+
+import itertools
+from pathlib import Path
+
+import numpy as np
+
+# Header size reserved at the start of data.npy. The real header is only known once every row
+# has been written, it gets padded out to this size with spaces (which the format allows).
+_HEADER_SIZE = 128
+_MAGIC = b"\x93NUMPY\x01\x00"
+
+
+def _header(dtype, shape):
+    header = repr({"descr": np.lib.format.dtype_to_descr(dtype), "fortran_order": False, "shape": shape})
+    header = header.encode("latin1").ljust(_HEADER_SIZE - len(_MAGIC) - 2 - 1) + b"\n"
+    return _MAGIC + np.uint16(len(header)).astype("<u2").tobytes() + header
+
+
+def _open(path, buffer_size):
+    """Open a .npy file for streaming, leaving room for a header written by _close()."""
+    file = open(path, "wb", buffering=buffer_size)
+    file.write(bytes(_HEADER_SIZE))
+    return file
+
+
+def _close(file, dtype, shape):
+    file.seek(0)
+    file.write(_header(dtype, shape))
+    file.close()
+
+
+def _save_offsets(path, lengths):
+    offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    np.save(path, offsets)
+
+
+def _rows(data, offsets):
+    return [data[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+
+def as_array(row, in_place):
+    """Pack a single row's trace into an array."""
+    if isinstance(row, np.ndarray):
+        return row.astype(np.int32 if in_place else np.int64, copy=False)
+    if in_place:
+        return np.fromiter(itertools.chain.from_iterable(row), dtype=np.int32, count=2 * len(row)).reshape(-1, 2)
+    return np.fromiter(row, dtype=np.int64, count=len(row))
+
+
+class TraceWriter:
+    def __init__(self, directory, buffer_size=2 ** 20):
+        """buffer_size is how many bytes are held in memory before being written to disk."""
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.buffer_size = buffer_size
+        self.in_place = None            # Decided by the first row that isn't empty
+        self.lengths = []
+        self.max_length = 0
+        self.event_lengths = None       # Only kept once a row comes with events
+        self._file = _open(self.directory / "data.npy", buffer_size)
+        self._events_file = None
+
+    def append(self, row, events=None):
+        """events is the row's (N, 3) event array from src.visualise.events, if it was recorded."""
+        if len(row) and self.in_place is None:
+            self.in_place = type(row[0]) is tuple or (isinstance(row, np.ndarray) and row.ndim == 2)
+        if len(row):
+            self._file.write(as_array(row, self.in_place).tobytes())
+        self.lengths.append(len(row))
+        self.max_length = max(self.max_length, len(row))
+
+        if events is not None:
+            if self._events_file is None:
+                self._events_file = _open(self.directory / "events.npy", self.buffer_size)
+                self.event_lengths = [0] * (len(self.lengths) - 1)
+            self._events_file.write(np.ascontiguousarray(events, dtype=np.int32).tobytes())
+            self.event_lengths.append(len(events))
+        elif self.event_lengths is not None:
+            self.event_lengths.append(0)
+
+    def close(self):
+        """Finish writing. Returns the directory the trace was written to."""
+        if self.in_place is None:
+            self.in_place = True
+        total = sum(self.lengths)
+        if self.in_place:
+            dtype, shape = np.dtype(np.int32), (total, 2)
+        else:
+            dtype, shape = np.dtype(np.int64), (total,)
+
+        _close(self._file, dtype, shape)
+        _save_offsets(self.directory / "offsets.npy", self.lengths)
+
+        if self._events_file is not None:
+            _close(self._events_file, np.dtype(np.int32), (sum(self.event_lengths), 3))
+            _save_offsets(self.directory / "event_offsets.npy", self.event_lengths)
+        return self.directory
+
+    def abort(self):
+        """Stop writing without finishing the trace, e.g. because sorting failed."""
+        self._file.close()
+        if self._events_file is not None:
+            self._events_file.close()
+
+
+def save(directory, swaps, events=None):
+    """Write an in-memory trace (and the events of every row, if given) to a directory."""
+    writer = TraceWriter(directory)
+    for row, row_events in zip(swaps, events or [None] * len(swaps)):
+        writer.append(row, row_events)
+    return writer.close()
+
+
+def load(directory):
+    """
+    Memory map a trace written by TraceWriter. Returns (swaps, in_place) where swaps holds a
+    view of the data for every row. Nothing is read from disk until the views are used.
+    """
+    directory = Path(directory)
+    data = np.load(directory / "data.npy", mmap_mode="r")
+    offsets = np.load(directory / "offsets.npy")
+    return _rows(data, offsets), data.ndim == 2
+
+
+def load_events(directory):
+    """Memory map the events saved with a trace, one view per row. None if they weren't recorded."""
+    directory = Path(directory)
+    if not (directory / "events.npy").exists():
+        return None
+    return _rows(np.load(directory / "events.npy", mmap_mode="r"), np.load(directory / "event_offsets.npy"))
@@ -1,5 +1,9 @@
 import numpy as np
 
+# Execution can take a while. Progress bars provide visual proof that program isn't hanging.
+# They live in src.visualise.progress, which rate limits them and can silence or redirect them.
+from src.visualise.progress import progress_bar, progress_complete
+
 
 # Add header to a frame
 def add_header(image, sorting_method, start_colour, end_colour):
@@ -36,27 +40,44 @@ def hex_to_rgb(hex_code):
         rgb_tuple.append(int(hex_code[i:i + 2], 16))
     return rgb_tuple
 
-# Execution can take a while. Progress bars provide visual proof that program isn't hanging.
-def progress_bar(text, iteration, max_iteration, length=40):
-    percentage = (100 * iteration / max_iteration)
-    completed = int(length * iteration / max_iteration)
-    bar = '█' * completed + "-" * (length - completed)
+# Imageio doesn't provide upscaling algorithms and I don't want to use PIL scaling
+def nearest_neighbour(image, x_res, y_res):
+    source_y = (np.arange(y_res) / y_res * image.shape[0]).astype(int)    # Source row for every output row
+    source_x = (np.arange(x_res) / x_res * image.shape[1]).astype(int)    # Source column for every output column
+    return image[source_y[:, np.newaxis], source_x[np.newaxis, :]].astype(np.uint8, copy=False)
 
-    print("\r{}|{}|".format(text, bar), end='\r')
+def changed_rect(before, after):
+    """
+    Smallest (top, left, bottom, right) rectangle holding every position where two images differ.
+    bottom and right are exclusive. If nothing changed the rectangle is empty, (0, 0, 0, 0).
+    """
+    changed = before != after
+    if changed.ndim > 2:
+        changed = changed.any(axis=tuple(range(2, changed.ndim)))
+    rows = np.flatnonzero(changed.any(axis=1))
+    if not rows.size:
+        return 0, 0, 0, 0
+    columns = np.flatnonzero(changed.any(axis=0))
+    return int(rows[0]), int(columns[0]), int(rows[-1]) + 1, int(columns[-1]) + 1
 
-def progress_complete(text, length=40):
-    bar = '█' * length
-    print("\r{}|{}|".format(text, bar))
+def union_rect(*rects):
+    """Smallest rectangle holding every one of rects. Empty rectangles are ignored."""
+    rects = [rect for rect in rects if rect[2] > rect[0] and rect[3] > rect[1]]
+    if not rects:
+        return 0, 0, 0, 0
+    top, left, bottom, right = zip(*rects)
+    return min(top), min(left), max(bottom), max(right)
 
-# Imageio doesn't provide upscaling algorithms and I don't want to use PIL scaling
-def nearest_neighbour(image, x_res, y_res):
-    scaled_image = np.zeros((y_res, x_res, 3), dtype=np.uint8)
-    for y in range(y_res):
-        source_y = int(y / y_res * image.shape[0])
-        for x in range(x_res):
-            source_x = int(x / x_res * image.shape[1])
-            scaled_image[y, x, :] = image[source_y, source_x, :]
-    return scaled_image
+def scale_rect(rect, shape, x_res, y_res):
+    """Rectangle covering the pixels that rect in an image of the given shape becomes after nearest_neighbour()."""
+    top, left, bottom, right = rect
+    if bottom <= top or right <= left:
+        return 0, 0, 0, 0
+    source_y = (np.arange(y_res) / y_res * shape[0]).astype(int)
+    source_x = (np.arange(x_res) / x_res * shape[1]).astype(int)
+    top, bottom = np.searchsorted(source_y, [top, bottom])
+    left, right = np.searchsorted(source_x, [left, right])
+    return int(top), int(left), int(bottom), int(right)
 
 def scale_frames_nn(frames, x_res, y_res):
     """
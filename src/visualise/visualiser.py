@@ -1,87 +1,283 @@
+import copy
+import random
+import tempfile
+
 import src.visualise.algorithms as algos
+from src.visualise import trace
 
-from src.visualise.utilities import progress_bar, progress_complete
+from src.colour.colour import ColourArray
+from src.colour.converter import ColourConverter
+from src.visualise.distributions import generate
+from src.visualise.events import Highlighter, recorded, track
+from src.visualise.utilities import changed_rect, progress_bar, progress_complete, union_rect
 
 from PIL import Image
 import numpy as np
 
+
+# Metrics for ordering the pixels of each row. Each takes an (N, 3) array of sRGB values in the 0-1 range.
+def _luma(pixels):
+    return pixels @ np.array([0.2126, 0.7152, 0.0722])
+
+def _hue(pixels):
+    return ColourConverter().convert_colour(ColourArray(pixels, "sRGB"), "HSV").channels[:, 0]
+
+def _lightness(pixels):
+    return ColourConverter().convert_colour(ColourArray(pixels, "sRGB"), "LAB").channels[:, 0]
+
+pixel_metrics = {
+    "luma": _luma,
+    "hue": _hue,
+    "lightness": _lightness,
+}
+
+
 class SortingVisualiser:
-    def __init__(self, image, randomise=True, reverse=False):
+    sorting_methods = {
+        "bubble_sort": algos.bubble_sort,
+        "cocktail_sort": algos.cocktail_sort,
+        "selection_sort": algos.selection_sort,
+        "insertion_sort": algos.insertion_sort,
+        "quick_sort": algos.quick_sort,
+        "heap_sort": algos.heap_sort,
+        "merge_sort": algos.it_merge_sort,
+        "radix_sort_lsd": algos.radix_sort_lsd,
+        "counting_sort": algos.counting_sort,
+        "my_sort": algos.my_sort
+    }
+    unique_keys_only = {"my_sort"}     # Put every key straight at its own index, so each key has to appear once
+    # Out-of-place algorithms never write to the row they're given, so they can't record events (see src.visualise.events)
+    no_events = {"merge_sort", "radix_sort_lsd", "counting_sort", "my_sort"}
+
+    def __init__(self, image, randomise=True, reverse=False, key="column", seed=None,
+                 distribution=None, distribution_options=None):
+        """
+        key decides what order the pixels of each row end up in once sorted. "column" keeps the
+        original order of the image. "luma", "hue" and "lightness" order the pixels by that metric.
+
+        seed makes the shuffle and any randomness used by the sorting algorithms reproducible.
+        When it isn't given one is drawn from the OS and stored in self.seed so the run can be repeated.
+
+        distribution names one of the input arrangements in src.visualise.distributions (such as
+        "nearly_sorted" or "sawtooth") and replaces the randomise and reverse flags when given.
+        distribution_options are passed on to the distribution function.
+        """
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.rng = np.random.default_rng(self.seed)
         self.original = np.asarray(image, dtype="uint8")            # Save original image
         self.rows, self.columns, _ = self.original.shape
-        self.replaced, self.replace_dict = self.__replace_with_integers() # Replace pixels with consecutive integers for sorting
+        self.key = key
+        self.palette = self.__create_palette(key)                  # Pixel for each integer, row by row
+        self.replaced = self.__replace_with_integers()              # Replace pixels with consecutive integers for sorting
 
-        if randomise:
-            self.__randomise_image()
-        if reverse:
-            self.__reverse_image()
+        if distribution is not None:
+            self.replaced = generate(distribution, self.replaced, self.rng, **(distribution_options or {}))
+        else:
+            if randomise:
+                self.__randomise_image()
+            if reverse:
+                self.__reverse_image()
 
+        self.initial = self.replaced.copy()     # Starting arrangement. The trace only depends on this.
         self.swaps = []
         self.max_swaps = 0
-        self.sorting_methods = {
-            "bubble_sort": algos.bubble_sort,
-            "cocktail_sort": algos.cocktail_sort,
-            "selection_sort": algos.selection_sort,
-            "insertion_sort": algos.insertion_sort,
-            "quick_sort": algos.quick_sort,
-            "heap_sort": algos.heap_sort,
-            "merge_sort": algos.it_merge_sort,
-            "radix_sort_lsd": algos.radix_sort_lsd,
-            "counting_sort": algos.counting_sort,
-            "my_sort": algos.my_sort
-        }
+        self.in_place = True
+        self.events = None      # Compares and reads of every row, when sorted with events=True
 
-    def __replace_with_integers(self):
+    def recolour(self, image):
         """
-        Replaces pixels of image with consecutive integers. Creates dictionary for reverting to normal.
+        Create a visualiser for a different image of the same size that starts from the same
+        arrangement of integers. Any sorting already done is shared rather than repeated, so one
+        sort can be rendered with many different colours.
         """
-        replaced = np.zeros((self.rows, self.columns))
-        replace_dict = []
+        visualiser = copy.copy(self)
+        visualiser.original = np.asarray(image, dtype="uint8")
+        if visualiser.original.shape != self.original.shape:
+            raise ValueError(f"image must have shape {self.original.shape}, not {visualiser.original.shape}")
 
-        for i in range(self.rows):
-            temp_dict = {}
-            for j in range(self.columns):
-                temp_dict[j] = self.original[i, j]
-                replaced[i, j] = j
-            replace_dict.append(temp_dict)
+        visualiser.palette = visualiser.__create_palette(self.key)
+        visualiser.replaced = self.initial.copy()
+        return visualiser
 
-        return replaced, replace_dict
+    def __create_palette(self, key):
+        """
+        Reorder the pixels of every row so that the pixel for integer i is the i-th pixel of the
+        row in the chosen order. Sorting the integers then rebuilds the rows in that order.
+        """
+        if key == "column":
+            return self.original.copy()
+        if key not in pixel_metrics:
+            raise ValueError(f"key must be 'column' or one of {', '.join(pixel_metrics)}")
+
+        metric = pixel_metrics[key](self.original.reshape(-1, 3) / 255).reshape(self.rows, self.columns)
+        order = np.argsort(metric, axis=1, kind="stable")
+        return np.take_along_axis(self.original, order[..., np.newaxis], axis=1)
+
+    def __replace_with_integers(self):
+        """
+        Replaces pixels of image with consecutive integers. The palette converts them back.
+        """
+        return np.tile(np.arange(self.columns), (self.rows, 1))
 
     def _replace_with_pixels(self):
         """
-        Use the replace_dict to convert image_array from consecutive integers back to their original
+        Use the palette to convert image_array from consecutive integers back to their original
         pixel values.
         """
-        pixel_array = np.zeros((self.rows, self.columns, 3), dtype="uint8")
-
-        for row in range(self.rows):
-            for column in range(self.columns):
-                key = int(self.replaced[row, column])
-                pixel = self.replace_dict[row][key]
-                pixel_array[row, column] = pixel
-        return pixel_array
+        return np.take_along_axis(self.palette, self.replaced[..., np.newaxis].astype(int), axis=1)
 
     def __reverse_image(self):
-        self.replaced = np.flip(self.replaced)
+        self.replaced = np.flip(self.replaced, axis=1)     # Reverse each row, leave the order of rows alone
 
     def __randomise_image(self):
-        for i in range(self.rows):
-            np.random.shuffle(self.replaced[i, :])
+        self.replaced = self.rng.permuted(self.replaced, axis=1)     # Shuffle every row independently in one go
+
+    def row_seed(self, row):
+        """
+        Seed for the randomness used while sorting a single row. Only depends on self.seed and the
+        row index, so rows can be sorted in any order (or by separate processes) with the same result.
+        """
+        return int(np.random.SeedSequence(self.seed, spawn_key=(row,)).generate_state(1)[0])
 
     def __swap_pixels(self, row, start, end):          # Swap pixels for an in place algorithms
-        for i, j in self.swaps[row][start:end]:
+        swaps = self.swaps[row][start:end]
+        if isinstance(swaps, np.ndarray):       # Traces loaded from a cache. Python ints are much faster to index with
+            swaps = swaps.tolist()
+        for i, j in swaps:
             self.replaced[row, i], self.replaced[row, j] = self.replaced[row, j], self.replaced[row, i]
 
-    def sort(self, sorting_method):
-        for row_index in range(self.rows):
-            row = self.replaced[row_index, :].copy()
-            temp_swaps = self.sorting_methods[sorting_method](row)
-            self.swaps.append(temp_swaps)
-            self.max_swaps = max(len(self.swaps[-1]), self.max_swaps)
-            progress_bar("Sorting GIF:\t", row_index, self.rows)
+    def sort(self, sorting_method, cache=None, out_of_core=False, events=False):
+        """
+        Sort every row, recording the swaps (or writes) made in self.swaps. If a TraceCache from
+        src.visualise.cache is given, a trace for the same algorithm and starting arrangement is
+        loaded from it instead of sorting, and new traces are saved to it.
+
+        With out_of_core set (or a cache given) each row's trace is written to disk as soon as the
+        row is sorted and self.swaps ends up as memory mapped views of the file, so traces larger
+        than memory can be rendered. out_of_core can be a directory to write the trace to, otherwise
+        a temporary directory is used and deleted along with the visualiser.
+
+        With events set, the compares and reads made by the algorithm are recorded in self.events as
+        well (see src.visualise.events), so iter_frames() can highlight them. It makes sorting a lot
+        slower, so it's off by default.
+        """
+        if sorting_method in self.unique_keys_only and (np.diff(np.sort(self.initial, axis=1), axis=1) == 0).any():
+            raise ValueError(f"{sorting_method} can only sort rows where every key is different")
+        if events and sorting_method in self.no_events:
+            raise ValueError(f"{sorting_method} doesn't sort in place, so it can't record compares and reads")
+
+        if cache is not None:
+            key = cache.key(sorting_method, self.initial, self.seed, events)
+            cached = cache.load(key)
+            if cached is not None:
+                self.swaps, self.in_place = cached
+                self.events = trace.load_events(cache.directory / key) if events else None
+                self.max_swaps = max((len(row) for row in self.swaps), default=0)
+                return
+            writer = cache.writer()
+        elif out_of_core:
+            if out_of_core is True:
+                self._trace_directory = tempfile.TemporaryDirectory(prefix="trace-")
+                out_of_core = self._trace_directory.name
+            writer = trace.TraceWriter(out_of_core)
+        else:
+            writer = None
+
+        self.swaps = []
+        self.events = [] if events else None
+        self.max_swaps = 0
+        random_state = random.getstate()     # Rows are sorted with their own seed, put the caller's back afterwards
+        try:
+            for row_index in range(self.rows):
+                row = self.replaced[row_index, :].copy()
+                if events:
+                    row = track(row)
+                random.seed(self.row_seed(row_index))     # Algorithms such as quick_sort pick random pivots
+                temp_swaps = self.sorting_methods[sorting_method](row)
+                row_events = recorded(row) if events else None
+                if writer is not None:
+                    writer.append(temp_swaps, row_events)
+                else:
+                    self.swaps.append(temp_swaps)
+                    if events:
+                        self.events.append(row_events)
+                self.max_swaps = max(len(temp_swaps), self.max_swaps)
+                progress_bar("Sorting GIF:\t", row_index, self.rows)
+        except BaseException:
+            if cache is not None:
+                cache.discard(writer)       # Don't leave a half written trace in the cache directory
+            raise
+        finally:
+            random.setstate(random_state)
         progress_complete("Sorting GIF:\t")
 
-    def visualise(self, num_frames, sort_method="bubble_sort"):
+        if cache is not None:
+            cache.commit(key, writer)
+            self.swaps, self.in_place = trace.load(cache.directory / key)
+            self.events = trace.load_events(cache.directory / key) if events else None
+        elif writer is not None:
+            directory = writer.close()
+            self.swaps, self.in_place = trace.load(directory)
+            self.events = trace.load_events(directory) if events else None
+        else:
+            self.in_place = next((type(row[0]) is tuple for row in self.swaps if len(row)), True)
+
+    def iter_frames(self, num_frames, sort_method="bubble_sort", dirty_rects=False, renderer=None, highlight=None):
+        """
+        Yield the frames of the visualisation one at a time, so they can be streamed somewhere (see
+        src.visualise.live and src.visualise.writers) without holding the whole animation in memory.
+
+        renderer is one of the renderers from src.visualise.renderers and draws each frame straight
+        at its output resolution. Without one, frames are the image at its original size.
+
+        With dirty_rects set, (frame, rect) pairs are yielded instead, where rect is the
+        (top, left, bottom, right) rectangle of the frame that changed since the previous frame, found
+        by comparing the integer arrays. The first frame's rectangle covers the whole frame. Writers
+        use these to only store the part of each frame that changed.
+
+        highlight paints over the elements the algorithm compared or read while making each frame. It
+        needs sort() to have been called with events=True. Pass True for the default colours, or a
+        Highlighter from src.visualise.events to pick the colours or only show the latest events.
+        """
+        if renderer is None:
+            render = self._replace_with_pixels
+        else:
+            render = lambda: renderer.render(self.replaced)
+
+        if highlight is True:
+            if self.events is None:
+                raise ValueError("sort with events=True to highlight compares and reads")
+            highlight = Highlighter(self.events, self.replaced.shape)
+
+        previous = None
+        previous_touched = touched = None
+        for start, end in self.__frames(num_frames, sort_method):
+            frame = render()
+            if highlight:
+                touched = np.zeros(self.replaced.shape, dtype=bool)
+                for mask, colour in highlight.masks(start, end):
+                    if renderer is None:
+                        frame[mask] = colour
+                    else:
+                        renderer.highlight(frame, self.replaced, mask, colour)
+                    touched |= mask
+            if not dirty_rects:
+                yield frame
+                continue
+
+            if previous is None:
+                rect = (0, 0, *frame.shape[:2])
+            else:
+                rect = changed_rect(previous, self.replaced)
+                if highlight:       # Highlights drawn in this frame or the last one change as well
+                    rect = union_rect(rect, changed_rect(np.zeros_like(touched), touched | previous_touched))
+                if renderer is not None:
+                    rect = renderer.rect(rect)
+            previous = self.replaced.copy()
+            previous_touched = touched
+            yield frame, rect
+
+    def __frames(self, num_frames, sort_method):
         """
         Use the data in self.swaps to show the sorting process. The number of frames determines
         how much data from self.swaps is used to modify the image array per frame. More frames means
@@ -93,20 +289,22 @@ class SortingVisualiser:
         An in-place algorithm will result in self.swaps being filled with the actual swaps made
         to move pixels into the correct position. In this case we simply replicate these swaps
         to show what happened when sorting the image. Swaps are captured as tuples of
-        (pixel_1_pos, pixel_2_pos). We use this type checking to determine which algorithm was
-        used.
+        (pixel_1_pos, pixel_2_pos). sort() sets self.in_place by checking for these tuples.
 
         An out-of-place algorithm will result in self.swaps containg copies of the array taken
         after each pass. To visualise this we simply slowly replace the current array with elements
         from the snapshot of the array.
+
+        Yields every time self.replaced is ready to be drawn as a frame, with the (start, end) part
+        of the trace applied since the last frame.
         """
         if not self.swaps:
             self.sort(sort_method)
 
         num_frames -= 1
-        frames = [self._replace_with_pixels()]
+        yield 0, 0
         # Determine if an in-place sorting algorithm was used
-        if type(self.swaps[0][0]) is tuple:
+        if self.in_place:
             swap_num = 0
             swap_step = self.max_swaps // num_frames    # Index needs to be an integer
             remainder = self.max_swaps % num_frames     # Find remainder from the int-division
@@ -121,8 +319,8 @@ class SortingVisualiser:
                 for row in range(self.rows):
                     self.__swap_pixels(row, swap_num, swap_num+swap_step+extra)
                 swap_num += swap_step + extra
-                frames.append(self._replace_with_pixels())
-                progress_bar("Creating GIF:\t", swap_num / self.max_swaps, self.max_swaps)
+                yield swap_num - swap_step - extra, swap_num
+                progress_bar("Creating GIF:\t", swap_num, self.max_swaps)
             progress_complete("Creating GIF:\t")
         else:
             pos = 0
@@ -151,9 +349,12 @@ class SortingVisualiser:
                         self.replaced[row, pos:pos_end] = self.swaps[row][swap_num:swap_end]
                 swap_num += swap_step + extra
                 pos = pos_end
-                frames.append(self._replace_with_pixels())
+                yield swap_num - swap_step - extra, swap_num
                 progress_bar("Creating GIF:\t", swap_num, self.max_swaps)
             progress_complete("Creating GIF:\t")
-        return frames
+
+    def visualise(self, num_frames, sort_method="bubble_sort"):
+        """Every frame as a list."""
+        return list(self.iter_frames(num_frames, sort_method))
 
 
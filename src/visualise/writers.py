@@ -0,0 +1,295 @@
+"""
+Output backends for rendered animations.
+
+A writer takes frames one at a time, so a render can be streamed straight to
+disk rather than collecting every frame in a list first:
+
+    with open_writer("bubble_sort.png", fps=30) as writer:
+        for frame, rect in visualiser.iter_frames(900, dirty_rects=True):
+            writer.write(frame, rect)
+
+    GifWriter       GIF through PIL. Limited to 256 colours, and PIL holds
+                    every frame until the file is closed
+    APNGWriter      Lossless animated PNG, written as frames arrive
+    WebPWriter      Animated WebP (lossless by default) through PIL, which
+                    also holds every frame until the file is closed
+    FFmpegWriter    MP4/WebM/MKV through an ffmpeg subprocess. Raw rgb24
+                    frames are piped to ffmpeg as they're made, so memory use
+                    doesn't grow with the length of the animation
+
+Consecutive frames of a sort mostly share pixels, so every writer takes an
+optional dirty rectangle, (top, left, bottom, right) with bottom and right
+exclusive, of the part of the frame that changed since the last one. An empty
+rectangle means nothing changed. APNGWriter only stores that part of each
+frame, and merges frames where nothing changed into the previous one. The GIF
+and WebP encoders crop every frame to what changed themselves, so they only
+use it to merge unchanged frames, and it makes no difference to video codecs.
+
+The backend is picked from the file extension by open_writer().
+"""
+
+import abc
+import shutil
+import struct
+import subprocess
+import tempfile
+import zlib
+from fractions import Fraction
+from pathlib import Path
+
+import numpy as np
+from PIL import Image
+
+from src.visualise.utilities import changed_rect
+
+
+def is_empty(rect):
+    return rect is not None and (rect[2] <= rect[0] or rect[3] <= rect[1])
+
+
+class Writer(abc.ABC):
+    """Base class. Subclasses implement write(frame, rect=None) for (height, width, 3) uint8 frames and close()."""
+    def __init__(self, path, fps):
+        self.path = Path(path)
+        self.fps = fps
+        self.frames = 0
+
+    @abc.abstractmethod
+    def write(self, frame, rect=None):
+        ...
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _PillowWriter(Writer):
+    """Collects frames and saves them with PIL on close. Frames where nothing changed lengthen the previous one."""
+    format = None
+
+    def __init__(self, path, fps, **options):
+        super().__init__(path, fps)
+        self.options = options
+        self._images = []
+        self._durations = []
+
+    def write(self, frame, rect=None):
+        if self._images and is_empty(rect):
+            self._durations[-1] += 1000 / self.fps
+        else:
+            self._images.append(Image.fromarray(frame))
+            self._durations.append(1000 / self.fps)
+        self.frames += 1
+
+    def close(self):
+        if self._images:
+            self._images[0].save(self.path, self.format, save_all=True, append_images=self._images[1:],
+                                 duration=[round(duration) for duration in self._durations], loop=0, **self.options)
+            self._images = []
+
+
+class GifWriter(_PillowWriter):
+    format = "GIF"
+
+
+def _delay(seconds):
+    """Frame delay as the (numerator, denominator) pair of 16 bit integers APNG stores."""
+    delay = Fraction(seconds).limit_denominator(1000)
+    if delay.numerator > 0xFFFF:
+        delay = Fraction(min(round(seconds), 0xFFFF))
+    return delay.numerator, delay.denominator
+
+
+class APNGWriter(Writer):
+    """
+    Written by hand rather than with PIL, which needs every frame up front. Each frame is stored as
+    the rectangle that changed, drawn over the previous frame, and filtered with the PNG Sub filter
+    (difference with the pixel to the left) which suits gradients. A frame is only written once the
+    next one with changes arrives, as until then its delay isn't known.
+    """
+    signature = b"\x89PNG\r\n\x1a\n"
+
+    def __init__(self, path, fps, compression=6):
+        super().__init__(path, fps)
+        self.compression = compression
+        self._file = open(self.path, "wb")
+        self._previous = None
+        self._pending = None        # [rect, compressed data, number of frames it's shown for]
+        self._sequence = 0
+        self._written = 0
+        self._actl_position = None
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data)))
+
+    def _start(self, height, width):
+        self._file.write(self.signature)
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))    # 8 bit RGB
+        self._actl_position = self._file.tell()
+        self._chunk(b"acTL", struct.pack(">II", 0, 0))     # Frame count is filled in by close(). Loop forever
+
+    def _compress(self, pixels):
+        filtered = pixels.copy()
+        filtered[:, 1:] -= pixels[:, :-1]       # Wraps around, as the Sub filter should
+        rows = np.empty((pixels.shape[0], pixels.shape[1] * 3 + 1), dtype=np.uint8)
+        rows[:, 0] = 1                          # Filter type of each row
+        rows[:, 1:] = filtered.reshape(pixels.shape[0], -1)
+        return zlib.compress(rows.tobytes(), self.compression)
+
+    def _flush(self):
+        if self._pending is None:
+            return
+        (top, left, bottom, right), data, count = self._pending
+        delay = _delay(count / self.fps)
+        # Dispose op none (keep this frame as the base of the next) and blend op source (replace the rectangle)
+        self._chunk(b"fcTL", struct.pack(">IIIIIHHBB", self._sequence, right - left, bottom - top, left, top, *delay, 0, 0))
+        self._sequence += 1
+        if self._written == 0:
+            self._chunk(b"IDAT", data)      # First frame doubles as the still image
+        else:
+            self._chunk(b"fdAT", struct.pack(">I", self._sequence) + data)
+            self._sequence += 1
+        self._written += 1
+        self._pending = None
+
+    def write(self, frame, rect=None):
+        frame = np.asarray(frame, dtype=np.uint8)
+        if self._previous is None:
+            self._start(*frame.shape[:2])
+            rect = (0, 0, *frame.shape[:2])     # First frame has to cover the whole image
+        elif rect is None:
+            rect = changed_rect(self._previous, frame)
+        self._previous = frame
+
+        if is_empty(rect):
+            self._pending[2] += 1
+        else:
+            self._flush()
+            top, left, bottom, right = rect
+            self._pending = [rect, self._compress(frame[top:bottom, left:right]), 1]
+        self.frames += 1
+
+    def close(self):
+        if self._file.closed:
+            return
+        if self._actl_position is None:        # No frames
+            self._file.close()
+            return
+        self._flush()
+        self._chunk(b"IEND", b"")
+        self._file.seek(self._actl_position)
+        self._chunk(b"acTL", struct.pack(">II", self._written, 0))
+        self._file.close()
+
+
+class WebPWriter(_PillowWriter):
+    format = "WEBP"
+
+    def __init__(self, path, fps, lossless=True, quality=80, method=4):
+        """quality is the compression effort when lossless, otherwise the image quality. method is 0 (fast) to 6 (small)."""
+        super().__init__(path, fps, lossless=lossless, quality=quality, method=method)
+
+
+# Encoder arguments for each codec, with the default preset and quality (crf) for each
+codecs = {
+    "h264": {"args": ["-c:v", "libx264", "-pix_fmt", "yuv420p"], "preset": "medium", "crf": 18},
+    "vp9": {"args": ["-c:v", "libvpx-vp9", "-pix_fmt", "yuv420p", "-b:v", "0", "-row-mt", "1"],
+            "preset": "good", "crf": 31},
+    "ffv1": {"args": ["-c:v", "ffv1", "-level", "3"], "preset": None, "crf": None},    # Lossless
+}
+
+# Codec used for each container when one isn't given
+container_codecs = {
+    ".mp4": "h264",
+    ".mov": "h264",
+    ".webm": "vp9",
+    ".mkv": "ffv1",
+    ".avi": "ffv1",
+}
+
+
+class FFmpegWriter(Writer):
+    def __init__(self, path, fps, codec=None, preset=None, crf=None, threads=None, executable="ffmpeg"):
+        """
+        codec is one of "h264", "vp9" or "ffv1" and defaults to the usual one for the file extension.
+        preset is an x264 preset ("ultrafast" to "veryslow") for h264 or a libvpx deadline ("realtime",
+        "good" or "best") for vp9. crf sets the quality, lower is better. threads limits how many
+        threads ffmpeg encodes with, by default ffmpeg decides.
+        """
+        super().__init__(path, fps)
+        if shutil.which(executable) is None:
+            raise FileNotFoundError(f"{executable} not found. Install ffmpeg or save as a GIF instead")
+
+        self.codec = codec or container_codecs.get(self.path.suffix.lower(), "h264")
+        if self.codec not in codecs:
+            raise ValueError(f"codec must be one of {', '.join(codecs)}")
+        self.preset = preset or codecs[self.codec]["preset"]
+        self.crf = codecs[self.codec]["crf"] if crf is None else crf
+        self.threads = threads
+        self.executable = executable
+        self.process = None
+        self._errors = tempfile.TemporaryFile()
+
+    def command(self, width, height):
+        command = [self.executable, "-y", "-loglevel", "error",
+                   "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(self.fps), "-i", "-"]
+        command += codecs[self.codec]["args"]
+        if self.preset is not None:
+            command += ["-deadline" if self.codec == "vp9" else "-preset", self.preset]
+        if self.crf is not None:
+            command += ["-crf", str(self.crf)]
+        if self.threads is not None:
+            command += ["-threads", str(self.threads)]
+        if "yuv420p" in command:
+            command += ["-vf", "pad=ceil(iw/2)*2:ceil(ih/2)*2"]     # 4:2:0 chroma needs even dimensions
+        return command + [str(self.path)]
+
+    def write(self, frame, rect=None):
+        if self.process is None:        # Frame size isn't known until the first frame arrives
+            height, width, _ = frame.shape
+            self.process = subprocess.Popen(self.command(width, height), stdin=subprocess.PIPE, stderr=self._errors)
+        try:
+            self.process.stdin.write(frame.tobytes())
+        except BrokenPipeError:
+            self.close()        # Raises with ffmpeg's error message
+            raise
+        self.frames += 1
+
+    def close(self):
+        if self.process is None:
+            return
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = self.process.wait()
+        self.process = None
+
+        self._errors.seek(0)
+        errors = self._errors.read().decode(errors="replace").strip()
+        self._errors.close()
+        if returncode != 0:
+            raise RuntimeError(f"ffmpeg exited with code {returncode}: {errors}")
+
+
+writers = {
+    ".gif": GifWriter,
+    ".png": APNGWriter,
+    ".apng": APNGWriter,
+    ".webp": WebPWriter,
+}
+
+
+def open_writer(path, fps, **options):
+    """Writer for the file extension of path. options are passed on to FFmpegWriter."""
+    suffix = Path(path).suffix.lower()
+    if suffix in writers:
+        return writers[suffix](path, fps)
+    if suffix in container_codecs:
+        return FFmpegWriter(path, fps, **options)
+    raise ValueError(f"can't write {suffix} files. Use one of {', '.join([*writers, *container_codecs])}")
@@ -0,0 +1,29 @@
+from PIL import Image
+
+from src.main import DEFAULTS, parse_args, run
+
+
+def render_settings(tmp_path, **overrides):
+    settings = dict(DEFAULTS, algorithm="quick_sort", num_colours=20, resolution="60x60", duration=1, fps=4,
+                    seed=0, output=str(tmp_path / "out.gif"))
+    settings.update(overrides)
+    return settings
+
+
+def test_custom_gradient_in_every_colour_space_renders_with_defaults(tmp_path):
+    for colour_space in ["RGB", "HSV", "XYZ", "LCHab"]:
+        settings = render_settings(tmp_path, colour_map="custom", colour_space=colour_space,
+                                   output=str(tmp_path / f"{colour_space}.gif"))
+        path = run(settings)
+        with Image.open(path) as image:
+            assert image.size == (60, 60)
+            assert image.n_frames > 1
+
+
+def test_unknown_colour_space_is_rejected_when_parsing(capsys):
+    try:
+        parse_args(["quick_sort", "--colour-space", "FOO"])
+    except SystemExit as error:
+        assert error.code == 2
+    else:
+        raise AssertionError("--colour-space FOO was accepted")